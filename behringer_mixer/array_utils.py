@@ -0,0 +1,122 @@
+""" Conversion functions from utils that operate on whole arrays of values
+
+Requires numpy, which is an optional dependency: pip install behringer-mixer[numpy]
+The results are identical to applying the scalar function from utils to
+each element.
+"""
+
+from functools import lru_cache
+from typing import Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError as err:
+    raise ImportError(
+        "behringer_mixer.array_utils requires numpy, "
+        "install it with: pip install behringer-mixer[numpy]"
+    ) from err
+
+X32_FADER_STEPS = 1024
+
+
+def _round_1(values):
+    """Round to one decimal place exactly as the builtin round(value, 1) does"""
+    scaled = values * 10
+    rounded = np.rint(scaled) / 10
+    # np.rint works on the scaled value, which can land on or next to .5 when
+    # the exact decimal value does not. Leave those few to the builtin.
+    ties = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if ties.any():
+        rounded[ties] = [round(float(value), 1) for value in values[ties]]
+    return rounded
+
+
+def fader_to_db_array(values, config: Optional[dict] = None):
+    """Convert an array of fader values to dB"""
+    values = np.asarray(values, dtype=np.float64)
+    shape = values.shape
+    values = values.reshape(-1)
+    db = np.select(
+        [values >= 1, values >= 0.5, values >= 0.25, values >= 0.0625, values >= 0],
+        [
+            np.full_like(values, 10.0),
+            _round_1((40 * values) - 30),
+            _round_1((80 * values) - 50),
+            _round_1((160 * values) - 70),
+            _round_1((480 * values) - 90),
+        ],
+        default=-90.0,
+    )
+    return db.reshape(shape)
+
+
+def db_to_fader_array(values, config: Optional[dict] = None):
+    """Convert an array of dB values to fader values"""
+    values = np.asarray(values, dtype=np.float64)
+    return np.select(
+        [values >= 10, values >= -10, values >= -30, values >= -60, values >= -90],
+        [
+            np.ones_like(values),
+            (values + 30) / 40,
+            (values + 50) / 80,
+            (values + 70) / 160,
+            (values + 90) / 480,
+        ],
+        default=0.0,
+    )
+
+
+def _linf_range(config) -> Tuple[float, float]:
+    """Return the (min, max) range from the mapping config"""
+    min = 0
+    max = 0
+    if config and config.get("data_type_config"):
+        min = config["data_type_config"].get("min")
+        max = config["data_type_config"].get("max")
+    return min, max
+
+
+def linf_to_db_array(values, config):
+    """Convert an array of linear fader values to dB"""
+    min, max = _linf_range(config)
+    return min + (max - min) * np.asarray(values, dtype=np.float64)
+
+
+def db_to_linf_array(values, config):
+    """Convert an array of dB values to linear fader values"""
+    min, max = _linf_range(config)
+    return (np.asarray(values, dtype=np.float64) - min) / (max - min)
+
+
+@lru_cache(maxsize=None)
+def x32_fader_table():
+    """Return the X32 fader steps and their dB values
+
+    The X32 quantizes faders to 1024 steps and sends each step as a 32 bit
+    float, so the table holds exactly the values received over OSC.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The fader values and the dB values.
+    """
+    faders = (np.arange(X32_FADER_STEPS) / (X32_FADER_STEPS - 1)).astype(np.float32)
+    faders = faders.astype(np.float64)
+    dbs = fader_to_db_array(faders)
+    faders.setflags(write=False)
+    dbs.setflags(write=False)
+    return faders, dbs
+
+
+def x32_fader_steps(values):
+    """Return the index of the nearest X32 fader step for an array of fader values"""
+    values = np.clip(np.asarray(values, dtype=np.float64), 0, 1)
+    return np.rint(values * (X32_FADER_STEPS - 1)).astype(np.intp)
+
+
+def quantize_x32_fader(values):
+    """Snap an array of fader values to the nearest X32 fader step"""
+    return x32_fader_table()[0][x32_fader_steps(values)]
+
+
+def x32_fader_to_db(values):
+    """Convert an array of X32 fader values to dB using the precomputed table"""
+    return x32_fader_table()[1][x32_fader_steps(values)]
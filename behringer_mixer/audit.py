@@ -0,0 +1,150 @@
+""" Background audit of the state against the mixer, to catch missed updates """
+
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+from .errors import MixerError
+
+
+class ConsistencyAuditor:
+    """Re-reads the mapped addresses a few at a time within a packet budget.
+
+    Subscription updates are sent over UDP and can be lost, leaving the state
+    out of step with the mixer. The auditor cycles through every address,
+    queries it and checks whether the reply changed the state after the
+    sequence number taken as the query was sent, so updates that arrived
+    while the batch was being queried are not counted as drift. Replies are
+    handled by the mixer as usual, so any difference is repaired (and
+    reported to the subscription callback) by the normal update path.
+    """
+
+    logger = logging.getLogger("behringermixer.audit")
+
+    def __init__(self, mixer, budget: float = 10.0, batch: int = 5):
+        """Initialize the auditor
+
+        Args:
+            mixer (MixerBase): The mixer to audit.
+            budget (float): The maximum number of queries per second.
+            batch (int): The number of addresses queried together.
+        """
+        self.mixer = mixer
+        self.budget = budget
+        self.batch = batch
+        self.audited = 0
+        self.drifted = 0
+        self.no_reply = 0
+        self.cycles = 0
+        self.recent_drift: deque = deque(maxlen=20)
+        self._queue: List[str] = []
+        self._cycle_audited = 0
+        self._cycle_drifted = 0
+        self._last_cycle_drift_rate: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start auditing in the background"""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    def stop(self) -> None:
+        """Stop auditing"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def run(self) -> None:
+        """Audit batches of addresses within the budget until cancelled
+
+        An unexpected error is logged and stops the audit.
+        """
+        while True:
+            started = time.monotonic()
+            if self._paused():
+                await asyncio.sleep(1)
+                continue
+            try:
+                count = await self.audit_batch()
+            except Exception:  # pylint: disable=broad-except
+                self.logger.exception("Audit stopped")
+                self._task = None
+                return
+            await asyncio.sleep(
+                max(0.0, max(count, 1) / self.budget - (time.monotonic() - started))
+            )
+
+    def _paused(self) -> bool:
+        """Return True while auditing would compete with a reload or cannot work"""
+        mixer = self.mixer
+        return mixer.server is None or mixer.reloading() or mixer.connection_lost()
+
+    async def audit_batch(self) -> int:
+        """Audit the next batch of addresses
+
+        Returns:
+            int: The number of addresses queried.
+        """
+        if not self._queue:
+            self._queue = self.mixer.reload_addresses()
+            self._queue.reverse()
+        batch = [self._queue.pop() for _ in range(min(self.batch, len(self._queue)))]
+        if not batch:
+            return 0
+        mixer = self.mixer
+        results = await asyncio.gather(
+            *(self._read(address, mixer.address_keys(address)) for address in batch),
+            return_exceptions=True,
+        )
+        for address, result in zip(batch, results):
+            if isinstance(result, MixerError):
+                self.no_reply += 1
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            self.audited += 1
+            self._cycle_audited += 1
+            if result is not None:
+                self.drifted += 1
+                self._cycle_drifted += 1
+                self.recent_drift.append(address)
+                self.logger.info("Repaired %s: %s -> %s", address, *result)
+        if not self._queue:
+            self.cycles += 1
+            if self._cycle_audited:
+                self._last_cycle_drift_rate = self._cycle_drifted / self._cycle_audited
+            self._cycle_audited = self._cycle_drifted = 0
+        return len(batch)
+
+    async def _read(self, address: str, keys: List[str]) -> Optional[Tuple[Any, Any]]:
+        """Query an address, returning its value before and after if the reply
+        changed it
+        """
+        state = self.mixer.state()
+        before = state.get(keys[0])
+        seq = state.seq
+        # Read back from the mixer, whatever the age of the values held
+        await self.mixer.get(keys[0], max_age=0)
+        changes, _ = state.changes_since(seq)
+        if changes.reset:
+            return None
+        if any(key in changes or key in changes.deleted for key in keys):
+            return before, state.get(keys[0])
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the audit counters
+
+        drift_rate is the fraction of audited addresses that had drifted, over
+        all cycles, and last_cycle_drift_rate the same for the last full cycle.
+        """
+        return {
+            "audited": self.audited,
+            "drifted": self.drifted,
+            "no_reply": self.no_reply,
+            "cycles": self.cycles,
+            "drift_rate": self.drifted / self.audited if self.audited else 0.0,
+            "last_cycle_drift_rate": self._last_cycle_drift_rate,
+            "recent_drift": list(self.recent_drift),
+        }
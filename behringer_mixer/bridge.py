@@ -0,0 +1,227 @@
+""" Bridge sharing one mixer subscription between many local OSC clients
+
+Clients talk OSC over UDP to the bridge instead of to the mixer:
+
+- "/subscribe" registers the client and sends it a snapshot of the state,
+  followed by every change. Keys are the output keys, eg "/ch/1/mix_fader".
+  A key removed from the state is sent as "/deleted" with the key. When the
+  state is cleared, "/reset" is sent, telling the client to drop every key,
+  followed by a new snapshot.
+- "/renew" must be sent at least every client_timeout seconds to keep
+  receiving updates, "/unsubscribe" stops them.
+- A message with a key and a value sets it on the mixer with set_value, a
+  message with just a key replies with its current value.
+
+Run it with: python -m behringer_mixer.bridge X32 192.168.1.10
+"""
+
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from itertools import chain
+import argparse
+import asyncio
+import logging
+import struct
+import time
+from pythonosc.osc_message_builder import BuildError
+from .errors import MixerError
+from .mixer_api import create
+from .osc_codec import OscEncoder, parse_datagram
+
+_BUNDLE_HEADER = b"#bundle\0" + struct.pack(">Q", 1)
+_MAX_DATAGRAM = 8192
+
+
+class _BridgeProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol passing client messages back to the bridge"""
+
+    def __init__(self, bridge):
+        self.bridge = bridge
+
+    def datagram_received(self, data, client_address):
+        self.bridge.datagram_received(data, client_address)
+
+
+class MixerBridge:
+    """Holds the single subscription to a mixer and fans it out to local clients"""
+
+    logger = logging.getLogger("behringermixer.bridge")
+
+    def __init__(
+        self,
+        mixer,
+        host: str = "127.0.0.1",
+        port: int = 10024,
+        client_timeout: float = 10.0,
+    ):
+        """Initialize the bridge
+
+        Args:
+            mixer (MixerBase): The mixer, started by serve().
+            host (str): The address to listen on for clients.
+            port (int): The UDP port to listen on for clients.
+            client_timeout (float): Seconds without "/renew" before a client is dropped.
+        """
+        self.mixer = mixer
+        self.host = host
+        self.port = port
+        self.client_timeout = client_timeout
+        self.clients: Dict[Tuple[str, int], float] = {}
+        self.transport = None
+        self._encoder = OscEncoder()
+        self._seq = 0
+        self._flush_pending = False
+
+    async def start(self) -> None:
+        """Start listening for clients"""
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _BridgeProtocol(self), local_addr=(self.host, self.port)
+        )
+        self.port = self.transport.get_extra_info("sockname")[1]
+        self._seq = self.mixer.state().seq
+
+    async def serve(self) -> None:
+        """Connect to the mixer and serve clients until cancelled"""
+        if not await self.mixer.start():
+            raise MixerError("Could not connect to the mixer")
+        await self.mixer.reload()
+        await self.start()
+        subscription = asyncio.ensure_future(self.mixer.subscribe(self.updated))
+        try:
+            while True:
+                await asyncio.sleep(1)
+                self.expire_clients()
+        finally:
+            subscription.cancel()
+            self.stop()
+            await self.mixer.unsubscribe()
+            await self.mixer.stop()
+
+    def stop(self) -> None:
+        """Stop listening for clients"""
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+        self.clients.clear()
+
+    def expire_clients(self) -> None:
+        """Drop the clients that have not renewed in time"""
+        now = time.monotonic()
+        for client, expires in list(self.clients.items()):
+            if expires < now:
+                del self.clients[client]
+
+    def datagram_received(self, data: bytes, client) -> None:
+        """Handle the messages from a client"""
+        try:
+            messages = parse_datagram(data)
+        except (ValueError, IndexError, struct.error):
+            return
+        for address, args in messages:
+            self._handle(client, address, args)
+
+    def _handle(self, client, address: str, args) -> None:
+        """Handle one message from a client"""
+        if address == "/subscribe":
+            self.clients[client] = time.monotonic() + self.client_timeout
+            self._send(client, self.mixer.state().items())
+        elif address == "/renew":
+            if client not in self.clients:
+                self._handle(client, "/subscribe", args)
+                return
+            self.clients[client] = time.monotonic() + self.client_timeout
+        elif address == "/unsubscribe":
+            self.clients.pop(client, None)
+        elif args:
+            task = asyncio.ensure_future(self._set_value(address, args[0]))
+            self.mixer.tasks.add(task)
+            task.add_done_callback(self.mixer.tasks.discard)
+        else:
+            value = self.mixer.state(address)
+            if value is not None:
+                self._send(client, [(address, value)])
+
+    async def _set_value(self, key: str, value: Any) -> None:
+        """Forward a write from a client to the mixer
+
+        The mixer does not echo a write back to the connection it came from,
+        set_value queries it again so the other clients see the change.
+        """
+        try:
+            await self.mixer.set_value(key, value)
+        except Exception:  # pylint: disable=broad-except
+            self.logger.exception("Could not set %s", key)
+        self.updated({})
+
+    def updated(self, _data: Dict[str, Any]) -> None:
+        """Subscription callback, sends the changes once the current burst is handled"""
+        if not self._flush_pending:
+            self._flush_pending = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self) -> None:
+        """Send the changes since the last flush to every client"""
+        self._flush_pending = False
+        changes, self._seq = self.mixer.state().changes_since(self._seq)
+        if not self.clients:
+            return
+        values: Iterable[Tuple[str, Any]] = changes.items()
+        if changes.reset:
+            # The changes are a snapshot of the whole state
+            values = chain([("/reset", [])], values)
+        values = chain(values, (("/deleted", key) for key in changes.deleted))
+        datagrams = list(self._datagrams(values))
+        for client in self.clients:
+            for datagram in datagrams:
+                self.transport.sendto(datagram, client)
+
+    def _send(self, client, values: Iterable[Tuple[str, Any]]) -> None:
+        """Send values to one client"""
+        for datagram in self._datagrams(values):
+            self.transport.sendto(datagram, client)
+
+    def _datagrams(self, values: Iterable[Tuple[str, Any]]) -> Iterator[bytes]:
+        """Encode values as OSC bundles of at most _MAX_DATAGRAM bytes"""
+        bundle = bytearray(_BUNDLE_HEADER)
+        for key, value in values:
+            if value is None:
+                continue
+            if isinstance(value, tuple):
+                value = list(value)
+            try:
+                message = bytes(self._encoder.encode(key, value))
+            except (BuildError, TypeError, ValueError):
+                self.logger.debug("Cannot encode %s", key)
+                continue
+            if len(bundle) + 4 + len(message) > _MAX_DATAGRAM and len(bundle) > len(
+                _BUNDLE_HEADER
+            ):
+                yield bytes(bundle)
+                bundle = bytearray(_BUNDLE_HEADER)
+            bundle += struct.pack(">i", len(message))
+            bundle += message
+        if len(bundle) > len(_BUNDLE_HEADER):
+            yield bytes(bundle)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    """Run a bridge from the command line"""
+    parser = argparse.ArgumentParser(
+        description="Share one mixer subscription between many local OSC clients"
+    )
+    parser.add_argument("mixer_type", help="eg X32, XR18, WING")
+    parser.add_argument("ip", help="The address of the mixer")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=10024, help="Port to listen on")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    mixer = create(args.mixer_type, ip=args.ip)
+    bridge = MixerBridge(mixer, host=args.host, port=args.port)
+    try:
+        asyncio.run(bridge.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
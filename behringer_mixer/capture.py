@@ -0,0 +1,138 @@
+""" Recording of the raw OSC traffic with the mixer, and replay of recordings
+
+A capture file starts with a header (magic and the wall clock time the
+capture started), followed by one record per datagram: the time since the
+start in seconds, the direction and the length, then the datagram itself.
+"""
+
+from typing import BinaryIO, Iterator, Tuple
+import asyncio
+import struct
+import time
+from .mixer_osc import RECEIVED, SENT, OSCClientServer
+
+_MAGIC = b"BMXCAP1\0"
+_HEADER = struct.Struct("<8sd")
+_RECORD = struct.Struct("<dBH")
+
+
+class CaptureWriter:
+    """Appends timestamped datagrams to a capture file
+
+    Records are buffered, and written to the file once flush_size bytes are
+    waiting or when a record arrives flush_interval seconds after the last
+    write, so a capture that is never closed loses little.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0, flush_size: int = 65536):
+        """Open a new capture file
+
+        Args:
+            path (str): The file to write, replaced if it exists.
+            flush_interval (float): Seconds after which buffered records are written.
+            flush_size (int): Bytes of buffered records that are written at once.
+        """
+        self.path = path
+        self.count = 0
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._file: BinaryIO = open(path, "wb")  # pylint: disable=consider-using-with
+        self._start = time.monotonic()
+        self._file.write(_HEADER.pack(_MAGIC, time.time()))
+        self.flush()
+
+    def record(self, direction: int, data: bytes) -> None:
+        """Append a datagram sent to (SENT) or received from (RECEIVED) the mixer"""
+        now = time.monotonic()
+        self._file.write(_RECORD.pack(now - self._start, direction, len(data)))
+        self._file.write(data)
+        self.count += 1
+        self._buffered += _RECORD.size + len(data)
+        if (
+            self._buffered >= self.flush_size
+            or now - self._flushed_at >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write any buffered records to the file"""
+        self._file.flush()
+        self._buffered = 0
+        self._flushed_at = time.monotonic()
+
+    def close(self) -> None:
+        """Close the capture file"""
+        self._file.close()
+
+
+def read_capture(path: str) -> Iterator[Tuple[float, int, bytes]]:
+    """Read a capture file
+
+    Args:
+        path (str): The capture file.
+
+    Returns:
+        Iterator[Tuple[float, int, bytes]]: The time in seconds since the capture
+        started, the direction (SENT or RECEIVED) and the datagram of each record.
+    """
+    with open(path, "rb") as capture:
+        header = capture.read(_HEADER.size)
+        if len(header) < _HEADER.size or header[:8] != _MAGIC:
+            raise ValueError(f"{path} is not a capture file")
+        while True:
+            record = capture.read(_RECORD.size)
+            if len(record) < _RECORD.size:
+                return
+            timestamp, direction, length = _RECORD.unpack(record)
+            data = capture.read(length)
+            if len(data) < length:
+                return
+            yield timestamp, direction, data
+
+
+async def replay(mixer, path: str, realtime: bool = False, speed: float = 1.0) -> int:
+    """Feed the datagrams received in a capture to a mixer
+
+    The datagrams go through the same receive path as live traffic: the
+    mixer's OSCClientServer if it was started, otherwise one created for the
+    replay that is never connected. A capture the mixer is recording is
+    paused during the replay, so the replayed datagrams are not recorded again.
+
+    Args:
+        mixer (MixerBase): The mixer to update.
+        path (str): The capture file.
+        realtime (bool): Keep the original timing between datagrams, otherwise
+            replay as fast as possible.
+        speed (float): In realtime, how many times faster than recorded to replay.
+
+    Returns:
+        int: The number of datagrams replayed.
+    """
+    server = mixer.server
+    if server is None:
+        server = OSCClientServer(
+            (mixer.ip, mixer.port),
+            mixer.msg_handler,
+            asyncio.get_running_loop(),
+            address_filter=mixer._receive_filter,
+            direct_receive=mixer.direct_receive,
+        )
+        server.tracer = mixer.tracer
+    recorder, server.recorder = server.recorder, None
+    count = 0
+    start = time.monotonic()
+    try:
+        for timestamp, direction, data in read_capture(path):
+            if direction != RECEIVED:
+                continue
+            if realtime:
+                delay = timestamp / speed - (time.monotonic() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif count % 256 == 0:
+                await asyncio.sleep(0)
+            server.datagram_received(data, (mixer.ip, mixer.port))
+            count += 1
+    finally:
+        server.recorder = recorder
+    return count
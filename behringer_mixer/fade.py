@@ -0,0 +1,188 @@
+""" Time based fades of faders and levels, driven by one shared ticker """
+
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import time
+from . import utils
+from .errors import MixerError
+
+CURVES = ("db", "fader")
+
+
+class _Fade:
+    """One running ramp"""
+
+    __slots__ = (
+        "key",
+        "row",
+        "start",
+        "target",
+        "started",
+        "duration",
+        "curve",
+        "done",
+    )
+
+    def __init__(self, key, row, start, target, duration, curve, done):
+        self.key = key
+        self.row = row
+        self.start = start
+        self.target = target
+        self.started = time.monotonic()
+        self.duration = duration
+        self.curve = curve
+        self.done = done
+
+    def value(self, now: float) -> Tuple[float, bool]:
+        """Return the fader value at a time, and whether the fade has finished"""
+        progress = (now - self.started) / self.duration if self.duration > 0 else 1
+        if progress >= 1:
+            return self.target, True
+        if self.curve == "fader":
+            return self.start + (self.target - self.start) * progress, False
+        functions = self.row["secondary_output"]["_db"]
+        to_db = getattr(utils, functions["forward_function"])
+        start_db = to_db(self.start, self.row)
+        target_db = to_db(self.target, self.row)
+        db = start_db + (target_db - start_db) * progress
+        return getattr(utils, functions["reverse_function"])(db, self.row), False
+
+
+class FadeEngine:
+    """Runs every active fade of a mixer from a single ticker.
+
+    Each tick the value of every fade is computed from the time since it
+    started, and the writes that changed are sent together as one paced
+    burst, so the ramps keep to time however many are running.
+    """
+
+    def __init__(self, mixer, tick: float = 0.05):
+        """Initialize the engine
+
+        Args:
+            mixer (MixerBase): The mixer to write to.
+            tick (float): Time between steps in seconds.
+        """
+        self.mixer = mixer
+        self.tick = tick
+        self._fades: Dict[str, _Fade] = {}
+        self._sent: Dict[str, Any] = {}
+        self._task = None
+
+    def fader_key(self, key: str, target: float) -> Tuple[str, dict, float]:
+        """Return the fader key, its mapping and the fader value for a fader or
+        dB key and target
+
+        dB targets are converted with the functions of the key's own mapping,
+        eg headamp gains are linear in dB rather than on the fader law.
+        """
+        mixer = self.mixer
+        in_db = key in mixer._secondary_mappings and key.endswith("_db")
+        if in_db:
+            key = mixer._mappings[mixer._secondary_mappings[key]]["output"]
+        row = mixer._mappings_reverse.get(key)
+        if row is None or "_db" not in row.get("secondary_output", {}):
+            raise MixerError(f"{key} is not a fader or level")
+        if in_db:
+            reverse = row["secondary_output"]["_db"]["reverse_function"]
+            target = getattr(utils, reverse)(target, row)
+        return key, row, min(1.0, max(0.0, target))
+
+    async def fade(
+        self, key: str, target: float, duration: float, curve: str = "db"
+    ) -> bool:
+        """Fade a fader or level to a target
+
+        Args:
+            key (str): A fader state key, eg "/ch/1/mix_fader" with a target from
+                0 to 1, or its dB key, eg "/ch/1/mix_fader_db" with a target in dB.
+            target (float): The value to end at.
+            duration (float): The length of the fade in seconds.
+            curve (str): "db" to change evenly in dB, "fader" to move the fader
+                evenly.
+
+        Returns:
+            bool: True if the fade completed, False if a later fade on the same
+            key, or stop(), cancelled it.
+
+        Raises:
+            MixerError: If the key is not a fader or level, the curve is unknown
+                or the current value of the key cannot be read from the mixer.
+        """
+        if curve not in CURVES:
+            raise MixerError(f"Unknown fade curve {curve}, use one of {CURVES}")
+        key, row, target = self.fader_key(key, target)
+        start = await self.mixer.get(key)
+        if start is None:
+            start = await self.mixer.get(key, max_age=0)
+        if start is None:
+            raise MixerError(f"The current value of {key} is not known")
+        done = asyncio.get_running_loop().create_future()
+        previous = self._fades.get(key)
+        if previous and not previous.done.done():
+            previous.done.set_result(False)
+        self._fades[key] = _Fade(key, row, start, target, duration, curve, done)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return await done
+
+    def cancel(self, key: Optional[str] = None) -> None:
+        """Stop the fade on a key where it is, or every fade"""
+        keys = [key] if key else list(self._fades)
+        for fade_key in keys:
+            fade = self._fades.pop(fade_key, None)
+            self._sent.pop(fade_key, None)
+            if fade and not fade.done.done():
+                fade.done.set_result(False)
+
+    async def _run(self) -> None:
+        """Step every active fade each tick until there are none"""
+        mixer = self.mixer
+        while self._fades:
+            started = time.monotonic()
+            messages: List[Tuple[str, Any]] = []
+            finished = []
+            for key, fade in list(self._fades.items()):
+                if fade.done.done():
+                    # The caller was cancelled while waiting for the fade
+                    del self._fades[key]
+                    continue
+                value, complete = fade.value(started)
+                row, sent = mixer._encode_write(key, value)
+                if self._sent.get(key) != sent:
+                    self._sent[key] = sent
+                    messages.append((row["input"], sent))
+                if complete:
+                    finished.append(fade)
+            if messages:
+                await mixer._send_batch(messages)
+            read_backs = []
+            for fade in finished:
+                if self._fades.get(fade.key) is fade:
+                    del self._fades[fade.key]
+                    self._sent.pop(fade.key, None)
+                    read_backs.append(fade)
+                elif not fade.done.done():
+                    fade.done.set_result(True)
+            if read_backs:
+                task = asyncio.ensure_future(self._read_back(read_backs))
+                mixer.tasks.add(task)
+                task.add_done_callback(mixer.tasks.discard)
+            await asyncio.sleep(max(0.0, self.tick - (time.monotonic() - started)))
+
+    async def _read_back(self, fades: List[_Fade]) -> None:
+        """Read the final values of finished fades back into the state
+
+        Runs in its own task, so the pacing of the queries does not hold up
+        the ticks of the fades still running. The fades are reported complete
+        once the queries are sent.
+        """
+        mixer = self.mixer
+        try:
+            await mixer._send_batch(
+                [(mixer._input_address(fade.key), None) for fade in fades]
+            )
+        finally:
+            for fade in fades:
+                if not fade.done.done():
+                    fade.done.set_result(True)
@@ -0,0 +1,84 @@
+""" Liveness tracking for the connection to the mixer """
+
+from typing import Any, Dict, Optional
+
+
+class HeartbeatMonitor:
+    """Tracks the replies to periodic liveness probes.
+
+    Round trip time and jitter are smoothed with EWMAs (as for TCP's
+    retransmission timer) and set the timeout for each probe. The connection
+    is declared lost after a number of consecutive missed probes.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.25,
+        misses: int = 3,
+        min_timeout: float = 0.1,
+        max_timeout: float = 1.0,
+    ):
+        """Initialize the monitor
+
+        Args:
+            interval (float): Time between probes in seconds.
+            misses (int): Consecutive missed probes before the connection is lost.
+            min_timeout (float): Lower bound of the probe timeout.
+            max_timeout (float): Upper bound of the probe timeout.
+        """
+        self.interval = interval
+        self.misses = misses
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.rtt: Optional[float] = None
+        self.jitter: Optional[float] = None
+        self.missed = 0
+        self.connected = True
+
+    def timeout(self) -> float:
+        """Return how long to wait for the reply to a probe"""
+        if self.rtt is None:
+            return self.max_timeout
+        timeout = self.rtt + 4 * self.jitter
+        return min(self.max_timeout, max(self.min_timeout, timeout))
+
+    def record_reply(self, rtt: float) -> bool:
+        """Record the round trip time of an answered probe
+
+        Returns:
+            bool: True if this changed the connection status.
+        """
+        if self.rtt is None:
+            self.rtt = rtt
+            self.jitter = rtt / 2
+        else:
+            self.jitter = 0.75 * self.jitter + 0.25 * abs(self.rtt - rtt)
+            self.rtt = 0.875 * self.rtt + 0.125 * rtt
+        self.missed = 0
+        return self._set_connected(True)
+
+    def record_miss(self) -> bool:
+        """Record a probe that was not answered
+
+        Returns:
+            bool: True if this changed the connection status.
+        """
+        self.missed += 1
+        if self.missed >= self.misses:
+            return self._set_connected(False)
+        return False
+
+    def _set_connected(self, connected: bool) -> bool:
+        """Update the connection status, returning True if it changed"""
+        changed = connected != self.connected
+        self.connected = connected
+        return changed
+
+    def status(self) -> Dict[str, Any]:
+        """Return the current heartbeat state"""
+        return {
+            "connected": self.connected,
+            "heartbeat_rtt": self.rtt,
+            "heartbeat_jitter": self.jitter,
+            "missed_heartbeats": self.missed,
+        }
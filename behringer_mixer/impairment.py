@@ -0,0 +1,126 @@
+""" Simulated network impairment of the OSC traffic, for testing """
+
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import random
+
+
+class Impairment:
+    """Loss, duplication, reordering, delay and rate limiting in one direction.
+
+    Every decision is drawn from the given random number generator, so the
+    same seed and traffic give the same pattern of drops and duplicates.
+    """
+
+    def __init__(
+        self,
+        rng: random.Random,
+        loss: float = 0.0,
+        duplicate: float = 0.0,
+        reorder: float = 0.0,
+        reorder_delay: float = 0.01,
+        delay: float = 0.0,
+        jitter: float = 0.0,
+        rate: Optional[float] = None,
+        queue_limit: int = 64,
+    ):
+        """Initialize the impairment
+
+        Args:
+            rng (random.Random): Source of the random decisions.
+            loss (float): Probability a datagram is dropped.
+            duplicate (float): Probability a datagram is delivered twice.
+            reorder (float): Probability a datagram is held back by reorder_delay,
+                letting later datagrams overtake it.
+            reorder_delay (float): Extra delay of reordered datagrams in seconds.
+            delay (float): Delay of every datagram in seconds.
+            jitter (float): Maximum random variation of the delay in seconds.
+            rate (Optional[float]): Maximum datagrams per second, excess ones are
+                queued.
+            queue_limit (int): With a rate, datagrams arriving when this many are
+                queued are dropped.
+        """
+        self.rng = rng
+        self.loss = loss
+        self.duplicate = duplicate
+        self.reorder = reorder
+        self.reorder_delay = reorder_delay
+        self.delay = delay
+        self.jitter = jitter
+        self.rate = rate
+        self.queue_limit = queue_limit
+        self._next_slot = 0.0
+        self.stats = {
+            "datagrams": 0,
+            "dropped": 0,
+            "duplicated": 0,
+            "reordered": 0,
+            "queue_dropped": 0,
+        }
+
+    def apply(self, data: bytes, deliver: Callable, *args: Any) -> None:
+        """Pass a datagram to deliver(data, *args), subject to the impairment"""
+        stats = self.stats
+        stats["datagrams"] += 1
+        rng = self.rng
+        if self.loss and rng.random() < self.loss:
+            stats["dropped"] += 1
+            return
+        copies = 1
+        if self.duplicate and rng.random() < self.duplicate:
+            stats["duplicated"] += 1
+            copies = 2
+        loop = asyncio.get_running_loop()
+        for _ in range(copies):
+            delay = self.delay
+            if self.jitter:
+                delay = max(0.0, delay + rng.uniform(-self.jitter, self.jitter))
+            if self.reorder and rng.random() < self.reorder:
+                stats["reordered"] += 1
+                delay += self.reorder_delay
+            if self.rate:
+                now = loop.time()
+                departure = max(now, self._next_slot)
+                if (departure - now) * self.rate >= self.queue_limit:
+                    stats["queue_dropped"] += 1
+                    continue
+                self._next_slot = departure + 1 / self.rate
+                delay += departure - now
+            if delay > 0:
+                loop.call_later(delay, deliver, data, *args)
+            else:
+                deliver(data, *args)
+
+
+class NetworkImpairment:
+    """Impairment of the traffic to (send) and from (receive) the mixer"""
+
+    def __init__(
+        self,
+        seed: Optional[int] = 0,
+        send: Optional[Dict[str, Any]] = None,
+        receive: Optional[Dict[str, Any]] = None,
+        **settings,
+    ):
+        """Initialize the impairment
+
+        Args:
+            seed (Optional[int]): Seed of the random number generators.
+            send (Optional[Dict[str, Any]]): Settings for the traffic to the mixer,
+                overriding settings.
+            receive (Optional[Dict[str, Any]]): Settings for the traffic from the
+                mixer, overriding settings.
+            **settings: Impairment settings applied in both directions, eg
+                loss=0.05, delay=0.02, jitter=0.01.
+        """
+        rng = random.Random(seed)
+        self.send = Impairment(
+            random.Random(rng.random()), **{**settings, **(send or {})}
+        )
+        self.receive = Impairment(
+            random.Random(rng.random()), **{**settings, **(receive or {})}
+        )
+
+    def status(self) -> Dict[str, Dict[str, int]]:
+        """Return the counts of impaired datagrams in each direction"""
+        return {"send": dict(self.send.stats), "receive": dict(self.receive.stats)}
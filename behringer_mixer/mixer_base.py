@@ -1,6 +1,7 @@
 """ Base module for the mixer """
 
-from typing import Optional, Callable, Dict, Any, List
+from typing import Optional, Callable, Dict, Any, List, Tuple, Union
+from collections import OrderedDict, deque
 import asyncio
 import logging
 import time
@@ -8,6 +9,28 @@ from .errors import MixerError
 from . import utils
 from .mixer_osc import OSCClientServer
 from .mappings import build_mappings
+from .osc_codec import float32
+from .capture import CaptureWriter
+from .fade import FadeEngine
+from .heartbeat import HeartbeatMonitor
+from .pacing import PacingController
+from .shared_state import SharedStateWriter
+from .state_store import Changes, StateStore
+from .tracing import CALLBACK
+
+
+def _same_value(first: Any, second: Any) -> bool:
+    """Return True if two values sent to the mixer are the same"""
+    if isinstance(first, (int, float)) and isinstance(second, (int, float)):
+        return float32(first) == float32(second) or abs(first - second) < 1e-6
+    return first == second
+
+
+def _stored_value(address_data: Dict[str, Any], value: Any) -> Any:
+    """Return a value to send as the mixer stores it, faders rounded to its steps"""
+    if type(value) is float and "_db" in address_data.get("secondary_output", {}):
+        return utils.quantize_fader(value, address_data)
+    return value
 
 
 class MixerBase:
@@ -16,12 +39,19 @@ class MixerBase:
     logger = logging.getLogger("behringermixer.behringermixer")
 
     _CONNECT_TIMEOUT = 0.5
+    _APPLY_BATCH = 16
+    # Tags of mappings that report status rather than hold settings: the
+    # mixer info, the USB player and the loaded show and scene
+    _STATUS_TAGS = (None, "usb", "show")
+    _SCENE_SETTLE = 1
 
     _info_response = []
     port_number: int = 10023
     # delay: float = 0.000
     addresses_to_load = []
+    reload_priority = []
     cmd_scene_load = ""
+    scene_nodes = []
     tasks = set()
     _mixer_status = {
         "ip_address": None,
@@ -35,42 +65,102 @@ class MixerBase:
         self.ip = kwargs.get("ip")
         self.port = kwargs.get("port") or self.port_number
         self._delay = kwargs.get("delay", 0) if "delay" in kwargs else self.delay
+        self._pacer = PacingController(
+            rate=1 / self._delay if self._delay else None,
+            min_rate=kwargs.get("min_send_rate", 50.0),
+            max_rate=kwargs.get("max_send_rate", 2000.0),
+            adaptive=kwargs.get("adaptive_pacing", True),
+        )
         if kwargs.get("logger"):
             self.logger = kwargs.get("logger")
         else:
             self.logger.addHandler(logging.StreamHandler())
             self.logger.setLevel(kwargs.get("logLevel") or logging.WARNING)
         self.include = kwargs.get("include") or []
+        self.direct_receive = kwargs.get("direct_receive", False)
+        self.lazy = kwargs.get("lazy", False)
+        self.connect_retries = kwargs.get("connect_retries", 0)
+        self.connect_rtt = None
+        self.capture = kwargs.get("capture")
+        self.impairment = kwargs.get("impairment")
+        self.tracer = kwargs.get("tracer")
+        self.optimistic_writes = kwargs.get("optimistic_writes", False)
+        self.reconcile_delay = kwargs.get("reconcile_delay", 0.1)
+        heartbeat_interval = kwargs.get("heartbeat_interval", 0)
+        self._heartbeat = (
+            HeartbeatMonitor(
+                interval=heartbeat_interval,
+                misses=kwargs.get("heartbeat_misses", 3),
+            )
+            if heartbeat_interval
+            else None
+        )
+        self._heartbeat_task = None
         if not self.ip:
             raise MixerError("No valid ip detected")
 
         self._callback_function = None
         self.subscription = None
-        self._state = {}
         self._mappings_reverse = {}
         self.server = None
         self._last_received = 0
         self._subscription_status_callback = None
         self._subscription_status_connection = False
+        self._reload_pending = []
+        self._received_at = {}
+        self._reply_waiters = {}
+        self._shared_state = None
+        self._optimistic = {}
+        self._fade_engine = FadeEngine(self, kwargs.get("fade_tick", 0.05))
+        self.scene_cache_size = kwargs.get("scene_cache_size", 0)
+        self._scene_cache = OrderedDict()
+        self._scene_validation = None
+        self._scene_reads = None
         self.extra_addresses_to_load = self.extra_addresses_to_load or []
         (self._mappings, self._secondary_mappings) = build_mappings(self)
         self._build_reverse_mappings()
+        self._state = StateStore(self._mappings)
+        self._groups = sorted(
+            {self._group(row["output"]) for row in self._mappings.values()}
+        )
+        self._loaded_groups = set()
+        self._group_loads = {}
+        self._receive_filter = set(self._mappings.keys()) | {"/xinfo", "/?", "/*"}
+
+    async def validate_connection(self, retries: Optional[int] = None) -> bool:
+        """Validate connection to the mixer
+
+        Completes as soon as the mixer answers the info query, waiting at most
+        _CONNECT_TIMEOUT for each attempt. The round trip time of the successful
+        attempt is recorded in connect_rtt.
+
+        Args:
+            retries (Optional[int]): How many more attempts to make if the mixer
+                does not answer, defaults to the connect_retries kwarg.
 
-    async def validate_connection(self):
-        """Validate connection to the mixer"""
-        await self.send(self.info_address)
-        await asyncio.sleep(self._CONNECT_TIMEOUT)
-        if not self.info_response:
+        Returns:
+            bool: True if the mixer answered.
+        """
+        retries = self.connect_retries if retries is None else retries
+        for _ in range(retries + 1):
+            sent = time.monotonic()
+            try:
+                await self._query_reply(self.info_address, self._CONNECT_TIMEOUT)
+            except MixerError:
+                continue
+            received = self._received_at.get(self.info_address, time.monotonic())
+            self.connect_rtt = max(received - sent, 0)
             self.logger.debug(
-                "Failed to setup OSC connection to mixer. Please check for correct ip address."
+                "Successfully connected to %s at %s.",
+                self._mixer_status.get("name"),
+                self._mixer_status.get("ip_address"),
             )
-            return False
+            return True
         self.logger.debug(
-            "Successfully connected to %s at %s.",
-            self._mixer_status.get("name"),
-            self._mixer_status.get("ip_address"),
+            "Failed to setup OSC connection to mixer. "
+            "Please check for correct ip address."
         )
-        return True
+        return False
 
     @property
     def info_response(self):
@@ -81,8 +171,17 @@ class MixerBase:
         """Startup the server"""
         if not self.server:
             self.server = OSCClientServer(
-                (self.ip, self.port), self.msg_handler, asyncio.get_event_loop()
+                (self.ip, self.port),
+                self.msg_handler,
+                asyncio.get_event_loop(),
+                address_filter=self._receive_filter,
+                direct_receive=self.direct_receive,
             )
+            self.server.prime(self._mappings.keys())
+            if self.capture:
+                self.server.recorder = CaptureWriter(self.capture)
+            self.server.impairment = self.impairment
+            self.server.tracer = self.tracer
             transport, protocol = await self.server.create_serve_endpoint()
             self.server.register_transport(transport, protocol)
         return await self.validate_connection()
@@ -90,10 +189,21 @@ class MixerBase:
     def msg_handler(self, addr, *data):
         """Handle callback response"""
 
-        self.logger.debug(f"received: {addr} {data if data else ''}")
-        self.logger.debug(f"received: a={addr} d={data if data else ''}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("received: %s %s", addr, data if data else "")
+        tracer = self.tracer
+        traced = tracer is not None and tracer.decoded(addr)
         self._last_received = time.time()
-        updates = self._update_state(addr, data)
+        pending = self._optimistic.get(addr) if self._optimistic else None
+        if pending is not None:
+            updates = self._reconcile(addr, data, pending)
+        elif self._scene_reads is not None and addr in self._mappings:
+            # Re-read of a cached scene, applied when it is complete
+            self._scene_reads[addr] = data
+            updates = []
+        else:
+            updates = self._update_state(addr, data)
+        self._replied(addr)
         if addr == "/xinfo":
             self.handle_xinfo(data)
             updates = []
@@ -101,25 +211,137 @@ class MixerBase:
         # on firmware / implementation.
         if addr in ("/*", "/?"):
             self.handle_winfo(data)
+            self._replied(self.info_address)
             updates = []
         if self._callback_function:
-            for row in updates:
-                self._callback_function(row)
+            if tracer is None:
+                for row in updates:
+                    self._callback_function(row)
+            else:
+                self._traced_callback(addr, updates, traced)
         else:
             self._info_response = data[:]
 
+    def _traced_callback(self, addr: str, updates: List[Dict], traced: bool) -> None:
+        """Run the subscription callback, recording its duration and errors"""
+        tracer = self.tracer
+        started = time.monotonic_ns()
+        try:
+            for row in updates:
+                self._callback_function(row)
+        except Exception as err:
+            tracer.error(addr, err)
+            raise
+        if traced:
+            tracer.record(CALLBACK, addr, time.monotonic_ns() - started)
+
+    def _replied(self, addr: str) -> None:
+        """Record that the mixer answered for an address"""
+        self._pacer.reply(addr)
+        if addr in self._mappings:
+            self._received_at[addr] = time.monotonic()
+        waiter = self._reply_waiters.pop(addr, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(True)
+        for pending, complete in self._reload_pending:
+            if addr in pending:
+                pending.discard(addr)
+                if not pending:
+                    complete.set()
+
     async def send(self, addr: str, param: Optional[str] = None):
         """Send an OSC message"""
-        self.logger.debug(f"sending: {addr} {param if param is not None else ''}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "sending: %s %s", addr, param if param is not None else ""
+            )
         self.server.send_message(addr, param)
         self._info_response = None
-        await asyncio.sleep(self._delay)
+        if param is None and addr in self._mappings:
+            self._pacer.expect(addr)
+        await self._pacer.pace()
+
+    async def _send_batch(self, messages: List[Tuple[str, Any]]) -> None:
+        """Send several OSC messages back to back, then pace for all of them"""
+        server = self.server
+        for addr, param in messages:
+            server.send_message(addr, param)
+            if param is None and addr in self._mappings:
+                self._pacer.expect(addr)
+        self._info_response = None
+        await self._pacer.pace(len(messages))
 
     async def query(self, address):
         """Send an receive the value of an OSC message"""
+        self._receive_filter.add(address)
         await self.send(address)
         return self.info_response
 
+    async def _query_reply(self, address: str, timeout: Optional[float] = None):
+        """Query an address and wait for the mixer to reply
+
+        Concurrent callers for the same address share a single query.
+
+        Args:
+            address (str): The mixer address to query.
+            timeout (Optional[float]): How long to wait for the reply.
+
+        Raises:
+            MixerError: If the mixer did not reply in time.
+        """
+        waiter = self._reply_waiters.get(address)
+        if waiter is None:
+            loop = asyncio.get_running_loop()
+            waiter = loop.create_future()
+            self._reply_waiters[address] = waiter
+            self._receive_filter.add(address)
+            loop.call_later(
+                timeout or self._CONNECT_TIMEOUT, self._expire_waiter, address, waiter
+            )
+            await self.send(address)
+        await asyncio.shield(waiter)
+
+    def _expire_waiter(self, address: str, waiter: asyncio.Future) -> None:
+        """Fail a query that has not been answered"""
+        if self._reply_waiters.get(address) is waiter:
+            del self._reply_waiters[address]
+        if not waiter.done():
+            waiter.set_exception(MixerError(f"No reply from mixer for {address}"))
+
+    async def get(self, key: str, max_age: Optional[float] = None) -> Any:
+        """Return the value of a state key, querying the mixer if it is stale
+
+        Args:
+            key (str): The state key, as returned by state().
+            max_age (Optional[float]): The maximum age in seconds of a cached
+                value. If None any cached value is returned.
+
+        Returns:
+            Any: The value of the key.
+
+        Raises:
+            MixerError: If the mixer did not reply to the query.
+        """
+        address = self._input_address(key)
+        if address is None:
+            return self._state.get(key)
+        if self.lazy and self._group(key) not in self._loaded_groups:
+            await self.fetch(key)
+            return self._state.get(key)
+        received = self._received_at.get(address)
+        if received is not None and key in self._state:
+            if max_age is None or time.monotonic() - received <= max_age:
+                return self._state.get(key)
+        await self._query_reply(address)
+        return self._state.get(key)
+
+    def _input_address(self, key: str) -> Optional[str]:
+        """Return the mixer address a state key is read from"""
+        if key in self._secondary_mappings:
+            return self._secondary_mappings[key]
+        address_data = self._mappings_reverse.get(key)
+        return address_data["input"] if address_data else None
+
     async def subscribe(self, callback_function):
         """run the subscribe worker"""
         await self._subscribe_worker(self.subscription_string, callback_function)
@@ -132,9 +354,18 @@ class MixerBase:
         if parameter_string == self.subscription_string:
             renew_string = self.subscription_string
         self._subscription_status_connection = True
+        if self._heartbeat and (
+            self._heartbeat_task is None or self._heartbeat_task.done()
+        ):
+            self._heartbeat.connected = True
+            self._heartbeat_task = asyncio.ensure_future(self._heartbeat_worker())
+            self.tasks.add(self._heartbeat_task)
+            self._heartbeat_task.add_done_callback(self.tasks.discard)
         while self._callback_function:
             await asyncio.sleep(9)
             await self.send(renew_string)
+            if self._heartbeat:
+                continue
             await self.send(self.info_address)
             if self.subscription_connected() != self._subscription_status_connection:
                 self._subscription_status_connection = (
@@ -150,6 +381,40 @@ class MixerBase:
 
         return True
 
+    async def _heartbeat_worker(self):
+        """Worker probing the mixer to detect loss of connection quickly."""
+        heartbeat = self._heartbeat
+        while self._callback_function:
+            sent = time.monotonic()
+            sent_wallclock = time.time()
+            try:
+                await self._query_reply(self.info_address, heartbeat.timeout())
+                received = self._received_at.get(self.info_address, time.monotonic())
+                changed = heartbeat.record_reply(max(received - sent, 0))
+            except MixerError:
+                # A lost probe only counts if nothing else arrived either
+                changed = (
+                    self._last_received < sent_wallclock and heartbeat.record_miss()
+                )
+            if changed:
+                self._subscription_status_connection = heartbeat.connected
+                if heartbeat.connected:
+                    # Coming back from loss of connection, reload without
+                    # holding up the heartbeats
+                    task = asyncio.ensure_future(self._resume_subscription())
+                    self.tasks.add(task)
+                    task.add_done_callback(self.tasks.discard)
+                elif self._subscription_status_callback:
+                    self._subscription_status_callback(False)
+            await asyncio.sleep(max(0, heartbeat.interval - (time.monotonic() - sent)))
+
+    async def _resume_subscription(self):
+        """Reload state after the connection comes back, then report it"""
+        await self.send(self.subscription_string)
+        await self.reload()
+        if self._subscription_status_callback and self._subscription_status_connection:
+            self._subscription_status_callback(True)
+
     async def unsubscribe(self):
         """Stop the subscription"""
         await self.send("/unsubscribe")
@@ -158,36 +423,437 @@ class MixerBase:
 
     async def stop(self):
         """Stop the OSC server"""
+        if self._shared_state:
+            writer, task = self._shared_state
+            task.cancel()
+            writer.close()
+            self._shared_state = None
+        self._fade_engine.cancel()
+        if self._scene_validation is not None:
+            self._scene_validation.cancel()
+            self._scene_validation = None
+        for address in list(self._optimistic):
+            self._clear_optimistic(address)
+        if self.server.recorder is not None:
+            self.server.recorder.close()
+            self.server.recorder = None
         self.server.shutdown()
         return True
 
     def state(self, key=None):
-        """Return current mixer state"""
+        """Return current mixer state
+
+        Without a key the StateStore itself is returned, a live mapping view of
+        the state. Use state().to_dict() for a copy.
+        """
         if key:
+            if self.lazy and self._group(key) not in self._loaded_groups:
+                self._schedule_fetch(key)
             return self._state.get(key)
         return self._state
 
+    def _group(self, key: str) -> str:
+        """Return the group a state key is loaded with in lazy mode, eg /chsend/5/"""
+        parts = key.split("/")
+        return "/".join(parts[:3]) + "/" if len(parts) > 3 else f"/{parts[1]}/"
+
+    def _schedule_fetch(self, prefix: str) -> None:
+        """Start loading the groups for a prefix in the background"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._group(prefix) in self._group_loads:
+            return
+        task = loop.create_task(self.fetch(prefix))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def fetch(self, prefix: str) -> None:
+        """Load the state keys for a key or prefix, eg /chsend/5/
+
+        Whole groups (eg all the keys of a channel) are loaded at once, and
+        groups that are already loaded are not queried again. Used by lazy mode
+        on first access, and can be called directly to warm up a group.
+
+        Args:
+            prefix (str): A state key or prefix.
+        """
+        groups = [
+            group
+            for group in self._groups
+            if group.startswith(prefix) or prefix.startswith(group)
+        ]
+        new_groups = [
+            group
+            for group in groups
+            if group not in self._loaded_groups and group not in self._group_loads
+        ]
+        if new_groups:
+            task = asyncio.ensure_future(self._load_groups(new_groups))
+            for group in new_groups:
+                self._group_loads[group] = task
+        loads = {
+            self._group_loads[group] for group in groups if group in self._group_loads
+        }
+        if loads:
+            await asyncio.gather(*loads)
+
+    async def _load_groups(self, groups: List[str]) -> Dict[str, Any]:
+        """Load a batch of groups
+
+        A group is only marked as loaded once one of its addresses has replied,
+        so groups lost to dropped packets are fetched again on the next access.
+        """
+        try:
+            report = await self._load_initial(prefix=groups)
+            missing = set(report["missing"])
+            arrived = {
+                self._group(self._mappings[address]["output"])
+                for tier in self._reload_tiers(prefix=groups)
+                for address in tier
+                if address not in missing
+            }
+            self._loaded_groups.update(group for group in groups if group in arrived)
+        finally:
+            for group in groups:
+                self._group_loads.pop(group, None)
+        return report
+
+    def changes_since(self, seq: int = 0) -> Tuple[Changes, int]:
+        """Return the state values that changed after a sequence number
+
+        Args:
+            seq (int): The high-water mark returned by the previous call, or 0.
+
+        Returns:
+            Tuple[Changes, int]: The changed values and the new high-water mark.
+            The changes are a dict, with a reset flag set if the state was
+            cleared (the values are then the whole state), and a deleted list
+            of the keys removed.
+        """
+        return self._state.changes_since(seq)
+
+    def export_shared_state(
+        self, name: Optional[str] = None, interval: float = 0.05
+    ) -> str:
+        """Publish the numeric state to shared memory for other processes
+
+        Faders, dB levels, mutes and sends are copied into the region whenever
+        they change, checked every interval seconds. Other processes attach with
+        shared_state.SharedStateReader(name). The region is removed by stop().
+
+        Args:
+            name (Optional[str]): Name of the shared memory region, generated if
+                not given.
+            interval (float): How often to check for changes in seconds.
+
+        Returns:
+            str: The name of the region.
+        """
+        if self._shared_state:
+            return self._shared_state[0].name
+        writer = SharedStateWriter(self._state, name)
+        task = asyncio.create_task(writer.run(interval))
+        self._shared_state = (writer, task)
+        return writer.name
+
     async def load_scene(self, scene_number):
-        """Load a new scene on the mixer"""
-        await self.send(self.cmd_scene_load, str(scene_number))
+        """Load a new scene on the mixer
+
+        With scene_cache_size the state after a scene has loaded is kept for
+        the most recently used scenes, without the status keys (eg /usb/state or
+        /scene/current) that do not belong to a scene. Loading a cached scene
+        applies its state at once, and the mixer is re-read in the background
+        so that only the values that differ from the cache are updated. The
+        cache cuts the time until the state is right, not the traffic: the
+        re-read queries as much as loading an uncached scene.
+        """
+        scene = str(scene_number)
+        if self._scene_validation is not None:
+            self._scene_validation.cancel()
+            self._scene_validation = None
+        cached = self._scene_cache.get(scene)
+        if cached is not None:
+            self._scene_cache.move_to_end(scene)
+            self._apply_cached_scene(cached)
+        await self.send(self.cmd_scene_load, scene)
         if self.cmd_scene_execute:
             await self.send(self.cmd_scene_execute[0], self.cmd_scene_execute[1])
+        if cached is not None:
+            self._scene_validation = asyncio.ensure_future(self._validate_scene(scene))
+            self.tasks.add(self._scene_validation)
+            self._scene_validation.add_done_callback(self.tasks.discard)
+            return {
+                "requested": 0,
+                "received": 0,
+                "retries": 0,
+                "missing": [],
+                "tiers": [],
+                "cached": True,
+            }
         # Because of potential UDP buffer overruns (lots of messages are sent on
         # a scene change), data may be lost
         # therefore we need to wait for the scene change to finish
         # and then update the state to make sure we have everything
-        await asyncio.sleep(1)
-        await self._load_initial()
+        await asyncio.sleep(self._SCENE_SETTLE)
+        report = await self._load_initial()
+        self._cache_scene(scene)
+        report["cached"] = False
+        return report
+
+    def _apply_cached_scene(self, cached: Dict[str, Any]) -> None:
+        """Set the state to a cached scene, notifying the values that change"""
+        state = self._state
+        for key, value in cached.items():
+            if key in state and state[key] == value:
+                continue
+            state[key] = value
+            if self._callback_function:
+                self._callback_function({"property": key, "value": value})
 
-    async def reload(self):
-        """Reload state"""
-        self._state = {}
-        await self._load_initial()
+    async def _validate_scene(self, scene: str) -> None:
+        """Re-read the mixer after loading a cached scene, and cache the result
+
+        The replies are collected aside and only the values that differ from
+        the cached scene are applied and notified.
+        """
+        await asyncio.sleep(self._SCENE_SETTLE)
+        reads = self._scene_reads = {}
+        try:
+            await self._load_initial()
+        finally:
+            self._scene_reads = None
+        state = self._state
+        for address, values in reads.items():
+            changed = [
+                row
+                for row in self._decode_message(address, values)
+                if row["property"] not in state
+                or state[row["property"]] != row["value"]
+            ]
+            if not changed:
+                continue
+            self._update_state(address, values)
+            if self._callback_function:
+                for row in changed:
+                    self._callback_function(row)
+        self._cache_scene(scene)
+
+    def _cache_scene(self, scene: str) -> None:
+        """Keep the current state as that of a scene, evicting the least recent"""
+        if not self.scene_cache_size:
+            return
+        self._scene_cache[scene] = {
+            key: value
+            for key, value in self._state.items()
+            if not self._is_status_key(key)
+        }
+        self._scene_cache.move_to_end(scene)
+        while len(self._scene_cache) > self.scene_cache_size:
+            self._scene_cache.popitem(last=False)
+
+    def _is_status_key(self, key: str) -> bool:
+        """Return True for a state key that is not a mixer setting, see diff()"""
+        address_data = self._mappings_reverse.get(key)
+        if address_data is None and key in self._secondary_mappings:
+            address_data = self._mappings.get(self._secondary_mappings[key])
+        return address_data is None or address_data.get("tag") in self._STATUS_TAGS
+
+    async def reload(
+        self,
+        retries: int = 3,
+        tags: Optional[List[str]] = None,
+        prefix: Optional[Union[str, List[str]]] = None,
+        priority: Optional[List[Union[str, List[str]]]] = None,
+        on_tier_complete: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Reload state
+
+        Without tags or prefix the whole state is cleared and re-queried,
+        otherwise only the selected subset is re-queried. Addresses are
+        loaded in tiers, so the most important values are back first.
+
+        Args:
+            retries (int): How many times to re-query addresses that did not reply.
+            tags (Optional[List[str]]): Only reload mappings with these tags,
+                eg ["usb"].
+            prefix (Optional[Union[str, List[str]]]): Only reload state keys
+                starting with this prefix.
+            priority (Optional[List[Union[str, List[str]]]]): The tier order,
+                defaults to reload_priority.
+            on_tier_complete (Optional[Callable[[int, Dict[str, Any]], None]]):
+                Called with the tier number and its report as each tier
+                completes.
+
+        Returns:
+            Dict[str, Any]: The completeness report of the reload.
+        """
+        if not tags and not prefix:
+            self._state.clear()
+        return await self._load_initial(
+            retries,
+            tags=tags,
+            prefix=prefix,
+            priority=priority,
+            on_tier_complete=on_tier_complete,
+        )
 
-    async def _load_initial(self):
+    async def _load_initial(
+        self,
+        retries: int = 3,
+        tags: Optional[List[str]] = None,
+        prefix: Optional[Union[str, List[str]]] = None,
+        priority: Optional[List[Union[str, List[str]]]] = None,
+        on_tier_complete: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
         """Load initial state"""
-        for address in self._mappings.keys():
-            await self.send(address)
+        if self.lazy and not tags and not prefix:
+            # Only refresh the groups that have been accessed
+            prefix = sorted(self._loaded_groups)
+            tiers = (
+                self._reload_tiers(prefix=prefix, priority=priority) if prefix else []
+            )
+        else:
+            tiers = self._reload_tiers(tags, prefix, priority)
+        report = {
+            "requested": 0,
+            "received": 0,
+            "retries": 0,
+            "missing": [],
+            "tiers": [],
+        }
+        for number, addresses in enumerate(tiers):
+            tier_report = await self._load_addresses(addresses, retries)
+            report["requested"] += tier_report["requested"]
+            report["received"] += tier_report["received"]
+            report["retries"] = max(report["retries"], tier_report["retries"])
+            report["missing"].extend(tier_report["missing"])
+            report["tiers"].append(tier_report)
+            if on_tier_complete:
+                on_tier_complete(number, tier_report)
+        report["missing"].sort()
+        return report
+
+    def reload_addresses(self) -> List[str]:
+        """Return the mapped addresses in reload priority order
+
+        In lazy mode only the addresses of the groups loaded so far are included.
+        """
+        addresses = [address for tier in self._reload_tiers() for address in tier]
+        if self.lazy:
+            addresses = [
+                address
+                for address in addresses
+                if self._group(self._mappings[address]["output"]) in self._loaded_groups
+            ]
+        return addresses
+
+    def address_keys(self, address: str) -> List[str]:
+        """Return the state keys updated by a mixer address, eg a fader and dB key"""
+        address_data = self._mappings.get(address)
+        if not address_data:
+            return []
+        output = address_data["output"]
+        return [output] + [
+            output + suffix for suffix in address_data.get("secondary_output", {})
+        ]
+
+    def reloading(self) -> bool:
+        """Return True while a reload or fetch is waiting for replies"""
+        return bool(self._reload_pending)
+
+    def _reload_tiers(
+        self,
+        tags: Optional[List[str]] = None,
+        prefix: Optional[Union[str, List[str]]] = None,
+        priority: Optional[List[Union[str, List[str]]]] = None,
+    ) -> List[List[str]]:
+        """Split the addresses to reload into tiers
+
+        Each tier is a list of tags, a tag may be suffixed with ":levels" to
+        only match its faders and mutes. Addresses are placed in the first
+        tier that matches them, anything unmatched goes into a final tier.
+
+        Returns:
+            List[List[str]]: The addresses of each non empty tier.
+        """
+        if priority is None:
+            priority = self.reload_priority
+        prefixes = (prefix,) if isinstance(prefix, str) else tuple(prefix or ())
+        tiers = [[] for _ in range(len(priority) + 1)]
+        for address, address_data in self._mappings.items():
+            tag = address_data.get("tag")
+            if tags and tag not in tags:
+                continue
+            if prefixes and not address_data["output"].startswith(prefixes):
+                continue
+            tiers[self._reload_tier(address_data, priority)].append(address)
+        return [tier for tier in tiers if tier]
+
+    @staticmethod
+    def _reload_tier(
+        address_data: Dict[str, Any], priority: List[Union[str, List[str]]]
+    ) -> int:
+        """Return the tier number an address belongs to"""
+        tag = address_data.get("tag")
+        is_level = address_data.get("data_type", "") in (
+            "boolean",
+            "boolean_inverted",
+        ) or "_db" in address_data.get("secondary_output", {})
+        for number, tier in enumerate(priority):
+            tier_tags = [tier] if isinstance(tier, str) else tier
+            if tag in tier_tags or (is_level and f"{tag}:levels" in tier_tags):
+                return number
+        return len(priority)
+
+    async def _load_addresses(
+        self, addresses: List[str], retries: int = 3
+    ) -> Dict[str, Any]:
+        """Query a set of addresses, retrying those that do not reply
+
+        Args:
+            addresses (List[str]): The addresses to query.
+            retries (int): The maximum number of retry rounds.
+
+        Returns:
+            Dict[str, Any]: The number of addresses requested and received, the
+            number of retry rounds used and the addresses that never replied.
+        """
+        pending = set(addresses)
+        complete = asyncio.Event()
+        tracker = (pending, complete)
+        self._reload_pending.append(tracker)
+        attempts = 0
+        wait = max(0.1, 4 * (self._pacer.srtt or 0))
+        try:
+            for address in addresses:
+                await self.send(address)
+            while True:
+                if pending:
+                    try:
+                        await asyncio.wait_for(complete.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+                if not pending or attempts >= retries:
+                    break
+                attempts += 1
+                wait *= 2
+                self.logger.debug(
+                    "Retrying %d addresses that did not reply", len(pending)
+                )
+                for address in [address for address in addresses if address in pending]:
+                    await self.send(address)
+        finally:
+            self._reload_pending.remove(tracker)
+        if pending:
+            self.logger.warning("No reply from mixer for %d addresses", len(pending))
+        return {
+            "requested": len(addresses),
+            "received": len(addresses) - len(pending),
+            "retries": attempts,
+            "missing": sorted(pending),
+        }
 
     def _update_state(self, address: str, values: List[Any]) -> List[Dict[str, Any]]:
         """Update internal state representation, called when a message is received
@@ -195,6 +861,21 @@ class MixerBase:
             address (str): The address to update.
             values (List[Any]): The values to update.
 
+        Returns:
+            List[Dict[str, Any]]: A list of updates.
+        """
+        updates = self._decode_message(address, values)
+        state = self._state
+        for row in updates:
+            state[row["property"]] = row["value"]
+        return updates
+
+    def _decode_message(self, address: str, values: List[Any]) -> List[Dict[str, Any]]:
+        """Convert a message from the mixer to state updates, without applying them
+        Args:
+            address (str): The address of the message.
+            values (List[Any]): The values of the message.
+
         Returns:
             List[Dict[str, Any]]: A list of updates.
         """
@@ -213,7 +894,6 @@ class MixerBase:
                 value = bool(value)
             if address_data.get("data_type", "") == "boolean_inverted":
                 value = not bool(value)
-            self._state[state_key] = value
             updates.append({"property": state_key, "value": value})
             for suffix, secondary_data in address_data.get(
                 "secondary_output", {}
@@ -226,7 +906,6 @@ class MixerBase:
                     secondary_value = getattr(
                         utils, secondary_data["forward_function"]
                     )(secondary_value, address_data)
-                self._state[secondary_key] = secondary_value
                 updates.append({"property": secondary_key, "value": secondary_value})
         return updates
 
@@ -235,13 +914,48 @@ class MixerBase:
         if not self._mappings_reverse:
             self._mappings_reverse = {v["output"]: v for v in self._mappings.values()}
 
-    async def set_value(self, address: str, value: Any) -> None:
+    async def set_value(
+        self, address: str, value: Any, optimistic: Optional[bool] = None
+    ) -> None:
         """Set the value in the mixer
 
         Args:
             address (str): The address to process.
             value (Any): The value to process.
+            optimistic (Optional[bool]): Apply the value to the state, and notify
+                the subscription callback, before the mixer confirms it. Defaults
+                to the optimistic_writes kwarg.
         """
+        address_data, value = self._encode_write(address, value)
+        if not address_data:
+            return
+        if optimistic is None:
+            optimistic = self.optimistic_writes
+        if (
+            optimistic
+            and "data_index" not in address_data
+            and "write_transform" not in address_data
+        ):
+            await self._write_optimistic(address_data["input"], value)
+            return
+        await self.send(address_data["input"], value)
+        await self.query(address_data["input"])
+
+    def _encode_write(self, address: str, value: Any) -> Tuple[Dict[str, Any], Any]:
+        """Convert a state key and value to the mapping row and value to send
+
+        Args:
+            address (str): The state key.
+            value (Any): The value, as held in the state.
+
+        Returns:
+            Tuple[Dict[str, Any], Any]: The mapping row, empty if the key is not
+            known, and the value to send to the mixer.
+
+        Raises:
+            MixerError: If the key has a set of values and the value is not one.
+        """
+        key = address
         address_data = None
         if address in self._secondary_mappings:
             address_data = self._mappings.get(self._secondary_mappings[address])
@@ -268,13 +982,215 @@ class MixerBase:
             value = str(value)
         if address_data.get("mapping"):
             reverse_map = {v: k for k, v in address_data["mapping"].items()}
+            if value not in reverse_map:
+                raise MixerError(f"{value!r} is not a valid value for {key}")
             value = reverse_map[value]
-        if address_data:
-            await self.send(address_data["input"], value)
-            await self.query(address_data["input"])
+        return address_data, value
+
+    async def _write_optimistic(self, address: str, value: Any) -> None:
+        """Apply a write to the state at once, then send it to the mixer
+
+        The next message from the mixer for the address, an echo or the reply
+        to a read-back sent reconcile_delay after the last write, confirms the
+        value or corrects it. Fader values are rounded to the mixer's steps
+        first, so the value applied is the one the mixer will send back.
+        """
+        # The mixer stores faders in steps and sends back the step it used
+        value = _stored_value(self._mappings[address], value)
+        sent = value
+        if type(value) is float:
+            # Compare with what the mixer will send back, a 32 bit float
+            sent = float32(value)
+        updates = self._decode_message(address, [sent])
+        pending = self._optimistic.get(address)
+        if pending is None:
+            pending = {"expected": deque(maxlen=16), "timer": None}
+            self._optimistic[address] = pending
+        pending["expected"].append(updates)
+        for row in updates:
+            self._state[row["property"]] = row["value"]
+        if self._callback_function:
+            for row in updates:
+                self._callback_function(dict(row))
+        if pending["timer"]:
+            pending["timer"].cancel()
+        pending["timer"] = asyncio.get_running_loop().call_later(
+            self.reconcile_delay, self._schedule_read_back, address
+        )
+        await self.send(address, value)
+
+    def _schedule_read_back(self, address: str) -> None:
+        """Start the read-back of an address with unconfirmed writes"""
+        task = asyncio.ensure_future(self._read_back(address))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _read_back(self, address: str) -> None:
+        """Query an address with unconfirmed writes, msg_handler reconciles the reply"""
+        pending = self._optimistic.get(address)
+        if pending is None:
+            return
+        pending["timer"] = None
+        try:
+            await self._query_reply(address)
+        except MixerError:
+            if self._optimistic.get(address) is pending and pending["timer"] is None:
+                del self._optimistic[address]
+                self.logger.warning("No read-back of the write to %s", address)
+
+    def _reconcile(self, address: str, values, pending) -> List[Dict[str, Any]]:
+        """Compare a message with unconfirmed writes to its address
+
+        Returns:
+            List[Dict[str, Any]]: The updates to notify, marked as corrections if
+            the mixer disagrees with the writes.
+        """
+        updates = self._decode_message(address, values)
+        expected = pending["expected"]
+        for index, written in enumerate(expected):
+            if updates == written:
+                if index == len(expected) - 1:
+                    self._clear_optimistic(address)
+                else:
+                    # An earlier write, the later ones are still to be confirmed
+                    for _ in range(index + 1):
+                        expected.popleft()
+                return []
+        self._clear_optimistic(address)
+        self.logger.info("Mixer corrected the write to %s", address)
+        for row in updates:
+            self._state[row["property"]] = row["value"]
+            row["correction"] = True
+        return updates
+
+    def _clear_optimistic(self, address: str) -> None:
+        """Forget the unconfirmed writes to an address"""
+        pending = self._optimistic.pop(address, None)
+        if pending and pending["timer"]:
+            pending["timer"].cancel()
+
+    def diff(self, target: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the values of a target state that differ from the current state
+
+        Each mixer parameter is compared once, a fader key is used in preference
+        to its dB key when the target has both. Values are compared as the
+        mixer would store them, faders rounded to its steps, so a value that
+        only differs by rounding is not a change. Unknown keys and status keys,
+        eg /status, /usb/state or /scene/current, are ignored.
+
+        Args:
+            target (Dict[str, Any]): State keys and values, eg from state().to_dict().
+
+        Returns:
+            Dict[str, Any]: The keys and target values that need writing.
+
+        Raises:
+            MixerError: If a target value cannot be sent to the mixer.
+        """
+        changes = {}
+        seen = set()
+        for key in sorted(target, key=lambda key: key in self._secondary_mappings):
+            if self._is_status_key(key):
+                continue
+            try:
+                address_data, value = self._encode_write(key, target[key])
+            except (TypeError, ValueError) as error:
+                raise MixerError(
+                    f"{target[key]!r} is not a valid value for {key}"
+                ) from error
+            if address_data["input"] in seen:
+                continue
+            seen.add(address_data["input"])
+            current = self._state.get(address_data["output"])
+            if current is not None and _same_value(
+                _stored_value(
+                    address_data, self._encode_write(address_data["output"], current)[1]
+                ),
+                _stored_value(address_data, value),
+            ):
+                continue
+            changes[key] = target[key]
+        return changes
+
+    async def apply(
+        self,
+        target: Dict[str, Any],
+        verify: bool = True,
+        retries: int = 2,
+        read_retries: int = 3,
+    ) -> Dict[str, Any]:
+        """Write only the values of a target state that differ from the state
+
+        The writes are sent in paced batches. With verify the written
+        addresses are read back, and any value the mixer did not take is
+        written again, up to retries times.
+
+        Args:
+            target (Dict[str, Any]): State keys and values, eg from state().to_dict().
+            verify (bool): Read back the written values.
+            retries (int): How many times to rewrite values that did not verify.
+            read_retries (int): How many times to resend a read-back that was
+                not answered.
+
+        Returns:
+            Dict[str, Any]: The number of changes, the number of writes sent, and
+            the keys that still differ after verification.
+
+        Raises:
+            MixerError: If a target value cannot be sent to the mixer, before
+                anything is written.
+        """
+        changes = self.diff(target)
+        report = {"changes": len(changes), "writes": 0, "unverified": []}
+        for _ in range(retries + 1):
+            if not changes:
+                break
+            messages = []
+            for key, value in changes.items():
+                address_data, value = self._encode_write(key, value)
+                messages.append((address_data["input"], value))
+            for start in range(0, len(messages), self._APPLY_BATCH):
+                await self._send_batch(messages[start : start + self._APPLY_BATCH])
+            report["writes"] += len(messages)
+            addresses = [address for address, _ in messages]
+            if not verify:
+                for address in addresses:
+                    await self.query(address)
+                break
+            await self._load_addresses(addresses, read_retries)
+            changes = self.diff(changes)
+        if verify:
+            report["unverified"] = sorted(changes)
+        return report
+
+    async def fade(
+        self, key: str, target: float, duration: float, curve: str = "db"
+    ) -> bool:
+        """Fade a fader or level to a target over a time
+
+        All of the running fades are stepped together by one ticker, their
+        writes sent as a single burst each tick. A new fade on a key replaces
+        the one running on it.
+
+        Args:
+            key (str): A fader key, eg "/ch/1/mix_fader" with a target from 0 to 1,
+                or its dB key, eg "/ch/1/mix_fader_db" with a target in dB.
+            target (float): The value to end at.
+            duration (float): The length of the fade in seconds.
+            curve (str): "db" to change evenly in dB, "fader" to move the fader
+                evenly.
+
+        Returns:
+            bool: True if the fade completed, False if it was replaced or stopped.
+        """
+        return await self._fade_engine.fade(key, target, duration, curve)
+
+    def cancel_fade(self, key: Optional[str] = None) -> None:
+        """Stop the fade on a key where it is, or every fade if no key is given"""
+        self._fade_engine.cancel(key)
 
     def last_received(self) -> float:
-        """Return the timestamp of the last time the module received a message from the mixer.
+        """Return the timestamp of the last time a message came from the mixer.
 
         Returns:
             float: The timestamp of the last received message.
@@ -282,20 +1198,31 @@ class MixerBase:
         return self._last_received
 
     def subscription_connected(self) -> bool:
-        """Return true if the module has received a message from the mixer in the last 15 seconds.
+        """Return true if the mixer is answering the heartbeat probes, or when
+        heartbeats are disabled, if the module has received a message from the
+        mixer in the last 15 seconds.
 
         Returns:
             bool: True if connected, False otherwise.
         """
+        if self._heartbeat and self._callback_function:
+            return self._heartbeat.connected
         return (time.time() - self._last_received) <= 15
 
+    def connection_lost(self) -> bool:
+        """Return True if the heartbeat probes have found the mixer not answering
+
+        Always False when heartbeats are disabled.
+        """
+        return self._heartbeat is not None and not self._heartbeat.connected
+
     async def subscription_status_register(
         self, callback_function: Callable[[bool], None]
     ) -> bool:
-        """Register a callback function that is called each time the status of the subscription changes.
+        """Register a function called each time the subscription status changes.
 
         Args:
-            callback_function (Callable[[bool], None]): The callback function to register.
+            callback_function (Callable[[bool], None]): The function to register.
 
         Returns:
             bool: True if registration is successful.
@@ -303,6 +1230,19 @@ class MixerBase:
         self._subscription_status_callback = callback_function
         return True
 
+    def status(self) -> Dict[str, Any]:
+        """Return the status of the mixer and of the connection to it.
+
+        Returns:
+            Dict[str, Any]: The mixer details along with the current send rate.
+        """
+        return {
+            **self._mixer_status,
+            "connect_rtt": self.connect_rtt,
+            **self._pacer.status(),
+            **(self._heartbeat.status() if self._heartbeat else {}),
+        }
+
     def name(self) -> Optional[str]:
         """Return the name of the mixer.
 
@@ -1,30 +1,129 @@
-from typing import Callable
+import asyncio
+import struct
+from typing import Callable, Container, Iterable, Optional
 from pythonosc.dispatcher import Dispatcher
-from pythonosc.osc_message_builder import OscMessageBuilder
 from pythonosc.osc_server import AsyncIOOSCUDPServer
+from .osc_codec import (
+    OscEncoder,
+    is_bundle,
+    iter_bundle,
+    parse_address,
+    parse_arguments,
+)
+
+# Directions of the datagrams passed to a recorder
+SENT = 0
+RECEIVED = 1
+
+
+class _OSCClientProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol passing received data back to the OSCClientServer"""
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, client_address):
+        impairment = self.server.impairment
+        if impairment is not None:
+            impairment.receive.apply(
+                data, self.server.datagram_received, client_address
+            )
+            return
+        self.server.datagram_received(data, client_address)
 
 
 class OSCClientServer(AsyncIOOSCUDPServer):
-    def __init__(self, address: str, msg_handler: Callable, event_loop):
-        """Create OSC Server"""
+    def __init__(
+        self,
+        address: str,
+        msg_handler: Callable,
+        event_loop,
+        address_filter: Optional[Container[str]] = None,
+        direct_receive: bool = False,
+    ):
+        """Create OSC Server
+
+        With direct_receive set, datagrams are decoded without the python-osc
+        Dispatcher and messages whose address is not in address_filter are
+        dropped before their arguments are decoded.
+
+        Set recorder to a capture.CaptureWriter to record every datagram sent
+        and received, and impairment to an impairment.NetworkImpairment to
+        simulate a poor network. Set tracer to a tracing.Tracer to trace the
+        messages sent and received.
+        """
         dispatcher = Dispatcher()
         dispatcher.set_default_handler(msg_handler)
         super().__init__(("0.0.0.0", 0), dispatcher, event_loop)
         self.mixer_address = address
         self.event_loop = event_loop
+        self.msg_handler = msg_handler
+        self.address_filter = address_filter
+        self.direct_receive = direct_receive
         self.transport = None
         self.protocol = None
+        self.encoder = OscEncoder()
+        self.recorder = None
+        self.impairment = None
+        self.tracer = None
+
+    def create_serve_endpoint(self):
+        """Create the datagram endpoint for the server"""
+        return self._loop.create_datagram_endpoint(
+            lambda: _OSCClientProtocol(self),
+            local_addr=self._server_address,
+        )
+
+    def datagram_received(self, data: bytes, client_address) -> None:
+        """Process a datagram received from the mixer"""
+        if self.tracer is not None:
+            self.tracer.received(len(data))
+        if self.recorder is not None:
+            self.recorder.record(RECEIVED, data)
+        if self.direct_receive:
+            self._receive_direct(data)
+        else:
+            self._dispatcher.call_handlers_for_packet(data, client_address)
+
+    def _receive_direct(self, data: bytes) -> None:
+        """Decode a datagram and pass any wanted messages to the handler"""
+        try:
+            if is_bundle(data):
+                for element in iter_bundle(data):
+                    self._receive_direct(element)
+                return
+            address, offset = parse_address(data)
+            if self.address_filter is not None and address not in self.address_filter:
+                return
+            args = parse_arguments(data, offset)
+        except (ValueError, IndexError, struct.error):
+            return
+        self.msg_handler(address, *args)
+
+    def prime(self, addresses: Iterable[str]):
+        """Precompute the encoded queries for the given addresses"""
+        self.encoder.prime(addresses)
 
     def send_message(self, address: str, vals):
         """Send OSC message"""
-        builder = OscMessageBuilder(address=address)
-        vals = vals if vals is not None else []
-        if not isinstance(vals, list):
-            vals = [vals]
-        for val in vals:
-            builder.add_arg(val)
-        msg = builder.build()
-        self.transport.sendto(msg.dgram, self.mixer_address)
+        datagram = self.encoder.encode(address, vals)
+        if self.recorder is not None:
+            self.recorder.record(SENT, datagram)
+        if self.tracer is not None:
+            self.tracer.sent(address, len(datagram))
+        if self.impairment is not None:
+            self.impairment.send.apply(bytes(datagram), self._send_datagram)
+            return
+        self.transport.sendto(datagram, self.mixer_address)
+
+    def _send_datagram(self, datagram: bytes):
+        """Send a datagram delayed by the impairment, unless shut down since"""
+        if self.transport is not None:
+            self.transport.sendto(datagram, self.mixer_address)
 
     def register_transport(self, transport, protocol):
         """Register transport into the object"""
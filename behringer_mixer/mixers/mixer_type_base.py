@@ -25,6 +25,22 @@ class MixerTypeBase(MixerBase):
 
     addresses_to_load = []
 
+    # Order in which reload() re-queries the mixer, faders and mutes first
+    reload_priority = [
+        [
+            "mains:levels",
+            "mono:levels",
+            "channels:levels",
+            "busses:levels",
+            "dcas:levels",
+            "matrices:levels",
+            "auxins:levels",
+            "mutegroups",
+        ],
+        ["channelsends", "bussends", "busmainsends", "headamps"],
+        ["mains", "mono", "channels", "busses", "dcas", "matrices", "auxins"],
+    ]
+
     cmd_scene_load = "/-action/goscene"
     cmd_scene_execute = None
 
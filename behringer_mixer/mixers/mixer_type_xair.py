@@ -6,6 +6,8 @@ class MixerTypeXAir(MixerTypeXSeriesBase):
 
     port_number: int = 10024
     cmd_scene_load = "/-snap/load"
+    # XAir sends have no on switch, the level comes first
+    scene_nodes = [(r"/ch/\d+/mix/\d+", ("level",))] + MixerTypeXSeriesBase.scene_nodes
 
     def __init__(self, **kwargs):
         self.extra_addresses_to_load = [
@@ -1,5 +1,8 @@
+from typing import List, Tuple
 from .mixer_type_base import MixerTypeBase
 
+_STRIPS = r"/(?:ch|auxin|fxrtn|bus|mtx|dca)/\d+|/main/(?:st|m)|/lr"
+
 
 class MixerTypeXSeriesBase(MixerTypeBase):
     """Base class for mixer type configuration"""
@@ -77,6 +80,8 @@ class MixerTypeXSeriesBase(MixerTypeBase):
                 "num_bus": 2,
             },
             "output": "/chsend/{num_channel}/{num_bus}/mix_fader",
+            # Send levels have 161 positions, not the 1024 of faders
+            "data_type_config": {"steps": 160},
             "secondary_output": {
                 "_db": {
                     "forward_function": "fader_to_db",
@@ -169,6 +174,8 @@ class MixerTypeXSeriesBase(MixerTypeBase):
             "input": "/bus/{num_bus}/mix/{num_matrix}/level",
             "input_padding": {"num_matrix": 2},
             "output": "/bussend/{num_bus}/{num_matrix}/mix_fader",
+            # Send levels have 161 positions, not the 1024 of faders
+            "data_type_config": {"steps": 160},
             "secondary_output": {
                 "_db": {
                     "forward_function": "fader_to_db",
@@ -352,3 +359,14 @@ class MixerTypeXSeriesBase(MixerTypeBase):
     ]
 
     cmd_scene_load = "/-action/goscene"
+    # The fields of each node line of a scene file, eg
+    # "/ch/01/mix ON -10.0 OFF +0 OFF -oo", in order. Each field is the last
+    # part of the address it is sent to.
+    scene_nodes: List[Tuple[str, Tuple[str, ...]]] = [
+        (rf"(?:{_STRIPS})/config", ("name", "icon", "color", "source")),
+        (rf"(?:{_STRIPS})/mix", ("on", "fader", "st", "pan", "mono", "mlevel")),
+        (r"/(?:ch|auxin|fxrtn|bus)/\d+/mix/\d+", ("on", "level", "pan", "type")),
+        (r"/dca/\d+", ("on", "fader")),
+        (r"/headamp/\d+", ("gain", "phantom")),
+        (r"/config/mute", ("1", "2", "3", "4", "5", "6")),
+    ]
@@ -0,0 +1,238 @@
+""" Live "top" style monitor of the traffic from a mixer
+
+Run it with: python -m behringer_mixer.monitor X32 192.168.1.10
+
+The counts come from the mixer's tracer. The tracer installed by the
+monitor only traces one message in ten by default, and the rates are scaled
+back up, so observing a busy connection costs a tenth of tracing all of it.
+"""
+
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+import argparse
+import asyncio
+import sys
+import time
+from .mixer_api import create
+from .tracing import CALLBACK, DECODE, RECEIVE, SEND, Tracer
+
+_CLEAR = "\x1b[H\x1b[J"
+
+
+class TrafficMonitor:
+    """Collects message rates, drops, latencies and reload progress of a mixer"""
+
+    def __init__(self, mixer, size: int = 65536, sample: float = 0.1):
+        """Attach to a mixer, installing a tracer if it does not have one
+
+        Args:
+            mixer (MixerBase): The mixer to observe.
+            size (int): The size of the tracer's buffer if one is installed. Events
+                beyond this many between samples are not counted.
+            sample (float): The fraction of messages traced if a tracer is
+                installed, 1.0 to count every message.
+        """
+        self.mixer = mixer
+        if mixer.tracer is None:
+            mixer.tracer = Tracer(size=size, sample=sample, dump_on_error=False)
+            if mixer.server:
+                mixer.server.tracer = mixer.tracer
+        self.tracer = mixer.tracer
+        self._cursor = self.tracer.events_since(0)[1]
+        self._sampled_at = time.monotonic()
+        self.reload_progress: Dict[str, Any] = {}
+
+    def sample(self) -> Dict[str, Any]:
+        """Return the statistics since the previous sample"""
+        events, cursor = self.tracer.events_since(self._cursor)
+        now = time.monotonic()
+        elapsed = max(now - self._sampled_at, 1e-9)
+        # Each traced message stands for 1 / sample messages
+        scale = elapsed * (self.tracer.sample or 1.0)
+        overwritten = cursor - self._cursor - len(events)
+        self._cursor = cursor
+        self._sampled_at = now
+        addresses = Counter()
+        sent = received = 0
+        decode = []
+        callback = []
+        for _, event, address, value in events:
+            if event == DECODE:
+                addresses[address] += 1
+                decode.append(value)
+            elif event == RECEIVE:
+                received += 1
+            elif event == SEND:
+                sent += 1
+            elif event == CALLBACK:
+                callback.append(value)
+        tags = Counter()
+        mappings = self.mixer._mappings
+        for address, count in addresses.items():
+            row = mappings.get(address)
+            tags[(row.get("tag") or "-") if row else "(unmapped)"] += count
+        status = self.mixer.status()
+        return {
+            "elapsed": elapsed,
+            "received_rate": received / scale,
+            "message_rate": sum(addresses.values()) / scale,
+            "sent_rate": sent / scale,
+            "address_rates": {
+                address: count / scale for address, count in addresses.items()
+            },
+            "tag_rates": {tag: count / scale for tag, count in tags.items()},
+            "decode_latency": _latency(decode),
+            "callback_latency": _latency(callback),
+            "overwritten": overwritten,
+            "status": status,
+            "reload": dict(self.reload_progress),
+        }
+
+    async def reload(self, **kwargs) -> Dict[str, Any]:
+        """Reload the mixer, tracking the progress through its tiers"""
+        tiers = len(
+            self.mixer._reload_tiers(
+                kwargs.get("tags"), kwargs.get("prefix"), kwargs.get("priority")
+            )
+        )
+        progress = self.reload_progress
+        progress.clear()
+        progress.update(
+            {"tiers": tiers, "done": 0, "requested": 0, "received": 0, "missing": 0}
+        )
+
+        def tier_complete(_number, report):
+            progress["done"] += 1
+            for key in ("requested", "received"):
+                progress[key] += report[key]
+            progress["missing"] += len(report["missing"])
+
+        report = await self.mixer.reload(on_tier_complete=tier_complete, **kwargs)
+        progress["finished"] = True
+        return report
+
+    def render(self, stats: Dict[str, Any], top: int = 20) -> str:
+        """Format statistics as a screen of text"""
+        status = stats["status"]
+        lines = [
+            f"{status.get('type') or ''} {status.get('name') or ''} "
+            f"{status.get('ip_address') or self.mixer.ip} "
+            f"firmware {status.get('firmware') or '?'}  "
+            f"connected {'yes' if status.get('connected', True) else 'NO'}",
+            f"in {stats['received_rate']:8.1f} datagrams/s "
+            f"{stats['message_rate']:8.1f} msg/s   out {stats['sent_rate']:8.1f} msg/s"
+            f"   send rate {status.get('send_rate') or 0:.0f}/s"
+            f"   rtt {_ms(status.get('rtt'))}",
+            f"drops: lost replies {status.get('lost_replies', 0)}"
+            f"   missed heartbeats {status.get('missed_heartbeats', 0)}"
+            f"   reload missing {stats['reload'].get('missing', 0)}"
+            f"   untraced events {stats['overwritten']}",
+            f"latency: decode {_latency_text(stats['decode_latency'])}"
+            f"   callback {_latency_text(stats['callback_latency'])}",
+        ]
+        reload = stats["reload"]
+        if reload:
+            state = "done" if reload.get("finished") else "running"
+            lines.append(
+                f"reload: {state} tier {reload['done']}/{reload['tiers']}"
+                f"   {reload['received']}/{reload['requested']} received"
+            )
+        lines.append("")
+        lines.append(f"{'msg/s':>9}  address")
+        lines.extend(_top(stats["address_rates"], top))
+        lines.append("")
+        lines.append(f"{'msg/s':>9}  tag")
+        lines.extend(_top(stats["tag_rates"], top))
+        return "\n".join(lines)
+
+
+def _latency(values) -> Optional[Dict[str, float]]:
+    """Return the mean and maximum of latencies in ns, or None"""
+    if not values:
+        return None
+    return {"mean": sum(values) / len(values) / 1e9, "max": max(values) / 1e9}
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.2f}ms"
+
+
+def _latency_text(latency: Optional[Dict[str, float]]) -> str:
+    if latency is None:
+        return "-"
+    return f"mean {_ms(latency['mean'])} max {_ms(latency['max'])}"
+
+
+def _top(rates: Dict[str, float], count: int) -> Iterable[str]:
+    """Format the highest rates"""
+    for name, rate in sorted(rates.items(), key=lambda item: -item[1])[:count]:
+        yield f"{rate:9.1f}  {name}"
+
+
+async def run(
+    mixer_type: str,
+    ip: str,
+    interval: float = 1.0,
+    top: int = 20,
+    reload: bool = True,
+    sample: float = 0.1,
+    **kwargs,
+) -> None:
+    """Connect to a mixer and display its traffic until cancelled"""
+    mixer = create(mixer_type, ip=ip, **kwargs)
+    monitor = TrafficMonitor(mixer, sample=sample)
+    if not await mixer.start():
+        print(f"No reply from the mixer at {ip}", file=sys.stderr)
+        return
+    tasks = [asyncio.ensure_future(mixer.subscribe(lambda data: None))]
+    if reload:
+        tasks.append(asyncio.ensure_future(monitor.reload()))
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            sys.stdout.write(_CLEAR + monitor.render(monitor.sample(), top) + "\n")
+            sys.stdout.flush()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await mixer.unsubscribe()
+        await mixer.stop()
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    """Run the monitor from the command line"""
+    parser = argparse.ArgumentParser(
+        description="Live view of the traffic from a mixer"
+    )
+    parser.add_argument("mixer_type", help="eg X32, XR18, WING")
+    parser.add_argument("ip", help="The address of the mixer")
+    parser.add_argument("--port", type=int, help="The port of the mixer")
+    parser.add_argument(
+        "--interval", type=float, default=1.0, help="Seconds between refreshes"
+    )
+    parser.add_argument("--top", type=int, default=20, help="Rows in each table")
+    parser.add_argument(
+        "--sample", type=float, default=0.1, help="Fraction of messages traced"
+    )
+    parser.add_argument(
+        "--no-reload", action="store_true", help="Do not load the state on start"
+    )
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(
+            run(
+                args.mixer_type,
+                args.ip,
+                interval=args.interval,
+                top=args.top,
+                reload=not args.no_reload,
+                sample=args.sample,
+                port=args.port,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+""" Lightweight OSC encoder and decoder for the message types used by the mixers """
+
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+import struct
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+_INT_MIN = -(2**31)
+_INT_MAX = 2**31 - 1
+
+_FLOAT = struct.Struct(">f")
+_pack_int = struct.Struct(">i").pack
+_pack_float = _FLOAT.pack
+_pack_uint = struct.Struct(">I").pack
+
+
+def float32(value: float) -> float:
+    """Round a value to a 32 bit float, as an OSC float argument carries it"""
+    return _FLOAT.unpack(_FLOAT.pack(value))[0]
+
+
+def pad_string(value: bytes) -> bytes:
+    """Null terminate and pad a byte string to a multiple of 4 bytes"""
+    return value + b"\x00" * (4 - (len(value) % 4))
+
+
+def pad_blob(value: bytes) -> bytes:
+    """Prefix a blob with its size and pad it to a multiple of 4 bytes"""
+    return _pack_uint(len(value)) + value + b"\x00" * (-len(value) % 4)
+
+
+class OscEncoder:
+    """Encode OSC messages, caching the parts that do not change between sends.
+
+    Addresses are encoded and padded once, and messages without arguments
+    (the queries sent during reload) are kept as complete datagrams.
+    Messages are assembled in a single reusable buffer; asyncio datagram
+    transports copy the data if they need to keep it, so the buffer is only
+    valid until the next call to encode.
+    """
+
+    def __init__(self):
+        self._addresses: Dict[str, bytes] = {}
+        self._queries: Dict[str, bytes] = {}
+        self._type_tags: Dict[str, bytes] = {}
+        self._buffer = bytearray()
+        self._payload = bytearray()
+
+    def prime(self, addresses: Iterable[str]) -> None:
+        """Precompute the query datagrams for a set of addresses"""
+        for address in addresses:
+            self.query(address)
+
+    def address(self, address: str) -> bytes:
+        """Return the encoded, padded address"""
+        encoded = self._addresses.get(address)
+        if encoded is None:
+            encoded = pad_string(address.encode())
+            self._addresses[address] = encoded
+        return encoded
+
+    def query(self, address: str) -> bytes:
+        """Return the datagram for a message without arguments"""
+        datagram = self._queries.get(address)
+        if datagram is None:
+            datagram = self.address(address) + b",\x00\x00\x00"
+            self._queries[address] = datagram
+        return datagram
+
+    def encode(self, address: str, vals: Any = None):
+        """Encode an OSC message
+
+        Args:
+            address (str): The OSC address.
+            vals (Any): A single value, a list of values or None.
+
+        Returns:
+            bytes | bytearray: The encoded datagram.
+        """
+        if vals is None or vals == []:
+            return self.query(address)
+        if not isinstance(vals, list):
+            vals = [vals]
+        tags = ","
+        payload = self._payload
+        del payload[:]
+        for val in vals:
+            val_type = type(val)
+            if val_type is float:
+                tags += "f"
+                payload += _pack_float(val)
+            elif val_type is int and _INT_MIN <= val <= _INT_MAX:
+                tags += "i"
+                payload += _pack_int(val)
+            elif val_type is str:
+                tags += "s"
+                payload += pad_string(val.encode())
+            elif val_type is bool:
+                tags += "T" if val else "F"
+            elif val_type is bytes or val_type is bytearray:
+                tags += "b"
+                payload += pad_blob(val)
+            else:
+                return self._encode_fallback(address, vals)
+        type_tags = self._type_tags.get(tags)
+        if type_tags is None:
+            type_tags = pad_string(tags.encode())
+            self._type_tags[tags] = type_tags
+        buffer = self._buffer
+        del buffer[:]
+        buffer += self.address(address)
+        buffer += type_tags
+        buffer += payload
+        return buffer
+
+    def _encode_fallback(self, address: str, vals: list) -> bytes:
+        """Encode argument types not handled directly using python-osc"""
+        builder = OscMessageBuilder(address=address)
+        for val in vals:
+            builder.add_arg(val)
+        return builder.build().dgram
+
+
+_unpack_int = struct.Struct(">i").unpack_from
+_unpack_float = struct.Struct(">f").unpack_from
+_unpack_uint = struct.Struct(">I").unpack_from
+_unpack_long = struct.Struct(">q").unpack_from
+_unpack_double = struct.Struct(">d").unpack_from
+
+_BUNDLE_PREFIX = b"#bundle\x00"
+
+
+def parse_address(data: bytes) -> Tuple[str, int]:
+    """Read the address of an OSC message
+
+    Args:
+        data (bytes): The datagram.
+
+    Returns:
+        Tuple[str, int]: The address and the offset of the type tag string.
+    """
+    end = data.index(b"\x00")
+    return data[:end].decode(), (end + 4) & ~3
+
+
+def parse_arguments(data: bytes, offset: int) -> List[Any]:
+    """Decode the typed arguments of an OSC message
+
+    Blob arguments are returned as memoryview slices of the datagram so
+    large payloads (eg meters) are not copied.
+
+    Args:
+        data (bytes): The datagram.
+        offset (int): The offset of the type tag string.
+
+    Returns:
+        List[Any]: The decoded arguments.
+    """
+    if offset >= len(data) or data[offset] != 0x2C:  # ","
+        return []
+    tags_end = data.index(b"\x00", offset)
+    tags = data[offset + 1 : tags_end]
+    offset = (tags_end + 4) & ~3
+    args = []
+    for tag in tags:
+        if tag == 0x66:  # f
+            args.append(_unpack_float(data, offset)[0])
+            offset += 4
+        elif tag == 0x69:  # i
+            args.append(_unpack_int(data, offset)[0])
+            offset += 4
+        elif tag == 0x73:  # s
+            end = data.index(b"\x00", offset)
+            args.append(data[offset:end].decode())
+            offset = (end + 4) & ~3
+        elif tag == 0x62:  # b
+            size = _unpack_uint(data, offset)[0]
+            offset += 4
+            args.append(memoryview(data)[offset : offset + size])
+            offset += (size + 3) & ~3
+        elif tag == 0x54:  # T
+            args.append(True)
+        elif tag == 0x46:  # F
+            args.append(False)
+        elif tag == 0x4E:  # N
+            args.append(None)
+        elif tag == 0x68:  # h
+            args.append(_unpack_long(data, offset)[0])
+            offset += 8
+        elif tag == 0x64:  # d
+            args.append(_unpack_double(data, offset)[0])
+            offset += 8
+        else:
+            raise ValueError(f"Unsupported OSC type tag: {chr(tag)}")
+    return args
+
+
+def iter_bundle(data: bytes) -> Iterator[bytes]:
+    """Iterate over the elements contained in an OSC bundle"""
+    offset = 16  # "#bundle\0" and the time tag
+    while offset < len(data):
+        size = _unpack_uint(data, offset)[0]
+        offset += 4
+        yield data[offset : offset + size]
+        offset += size
+
+
+def is_bundle(data: bytes) -> bool:
+    """Return True if the datagram is an OSC bundle"""
+    return data[:8] == _BUNDLE_PREFIX
+
+
+def parse_datagram(data: bytes) -> List[Tuple[str, List[Any]]]:
+    """Decode every message contained in a datagram
+
+    Args:
+        data (bytes): The datagram.
+
+    Returns:
+        List[Tuple[str, List[Any]]]: The address and arguments of each message.
+    """
+    if is_bundle(data):
+        messages = []
+        for element in iter_bundle(data):
+            messages.extend(parse_datagram(element))
+        return messages
+    address, offset = parse_address(data)
+    return [(address, parse_arguments(data, offset))]
@@ -0,0 +1,124 @@
+""" Adaptive pacing of the messages sent to the mixer """
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import asyncio
+import time
+
+
+class PacingController:
+    """Token bucket limiting the rate of outbound messages.
+
+    The rate adapts AIMD style: every reply to a tracked query increases it
+    additively, while a lost reply or a round trip time that has grown well
+    above the best seen so far decreases it multiplicatively.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = 500.0,
+        min_rate: float = 50.0,
+        max_rate: float = 2000.0,
+        burst: float = 1.0,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        reply_timeout: float = 0.25,
+        adaptive: bool = True,
+    ):
+        """Initialize the controller
+
+        Args:
+            rate (Optional[float]): Initial rate in messages per second. None or 0
+                disables pacing.
+            min_rate (float): Lower bound for the adapted rate.
+            max_rate (float): Upper bound for the adapted rate.
+            burst (float): Size of the token bucket.
+            increase (float): Rate added for each reply received.
+            decrease (float): Factor applied to the rate on loss or congestion.
+            reply_timeout (float): Minimum time before a query is considered lost.
+            adaptive (bool): If False the rate stays fixed.
+        """
+        self.enabled = bool(rate)
+        self.rate = float(rate) if rate else 0.0
+        self.min_rate = min(min_rate, self.rate) if self.enabled else min_rate
+        self.max_rate = max(max_rate, self.rate)
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.reply_timeout = reply_timeout
+        self.adaptive = adaptive
+        self.srtt: Optional[float] = None
+        self.min_rtt: Optional[float] = None
+        self.losses = 0
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._last_decrease = 0.0
+        self._outstanding: "OrderedDict[str, float]" = OrderedDict()
+
+    async def pace(self, count: int = 1) -> None:
+        """Take tokens for messages just sent, sleeping if the bucket is empty
+
+        Args:
+            count (int): The number of messages sent.
+        """
+        if not self.enabled:
+            await asyncio.sleep(0)
+            return
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= count
+        if self._outstanding:
+            self._expire(now)
+        await asyncio.sleep(-self._tokens / self.rate if self._tokens < 0 else 0)
+
+    def expect(self, address: str) -> None:
+        """Record that a query was sent and a reply is expected"""
+        if self.adaptive:
+            self._outstanding[address] = time.monotonic()
+            self._outstanding.move_to_end(address)
+
+    def reply(self, address: str) -> None:
+        """Record a reply from the mixer"""
+        sent = self._outstanding.pop(address, None)
+        if sent is None:
+            return
+        now = time.monotonic()
+        rtt = now - sent
+        self.srtt = rtt if self.srtt is None else 0.875 * self.srtt + 0.125 * rtt
+        if self.min_rtt is None or rtt < self.min_rtt:
+            self.min_rtt = rtt
+        if self.srtt > max(4 * self.min_rtt, 0.02):
+            # Replies are queueing up somewhere, back off before they get lost
+            self._decrease(now)
+        else:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def _expire(self, now: float) -> None:
+        """Treat queries that have not been answered in time as lost"""
+        timeout = max(self.reply_timeout, 4 * (self.srtt or 0))
+        lost = False
+        while self._outstanding:
+            address, sent = next(iter(self._outstanding.items()))
+            if now - sent < timeout:
+                break
+            del self._outstanding[address]
+            self.losses += 1
+            lost = True
+        if lost:
+            self._decrease(now)
+
+    def _decrease(self, now: float) -> None:
+        """Multiplicative decrease, at most once per round trip"""
+        if now - self._last_decrease < max(self.srtt or 0, self.reply_timeout):
+            return
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+
+    def status(self) -> Dict[str, Any]:
+        """Return the current pacing state"""
+        return {
+            "send_rate": self.rate if self.enabled else None,
+            "rtt": self.srtt,
+            "lost_replies": self.losses,
+        }
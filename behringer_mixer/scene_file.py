@@ -0,0 +1,120 @@
+""" Offline parser of X32 scene (.scn) and XAir snapshot (.snp) files """
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import math
+import os
+import re
+from . import utils
+from .errors import MixerError
+from .osc_codec import float32
+
+_TOKENS = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def _compile(nodes) -> List[Tuple[re.Pattern, Tuple[str, ...]]]:
+    return [(re.compile(pattern), fields) for pattern, fields in nodes]
+
+
+def _tokens(text: str) -> List[Union[str, Tuple[str]]]:
+    """Split the values of a line, strings in quotes are returned in a tuple"""
+    return [(quoted,) if not bare else bare for quoted, bare in _TOKENS.findall(text)]
+
+
+def iter_messages(mixer, lines: Iterable[str]) -> Iterator[Tuple[str, Any]]:
+    """Convert the lines of a scene file to the messages the mixer would send
+
+    Node lines are split into their fields and values are converted from
+    their text form, eg "-oo", "+4.5", "ON" or "RD", to the value the mixer
+    sends for the field. Fields that are not mapped are skipped.
+
+    Args:
+        mixer (MixerBase): The mixer whose mappings are used.
+        lines (Iterable[str]): The lines of the file, read one at a time.
+
+    Yields:
+        Tuple[str, Any]: The mixer address and value of each mapped field.
+    """
+    if not mixer.scene_nodes:
+        raise MixerError(f"Scene files of {type(mixer).__name__} are not supported")
+    nodes = _compile(mixer.scene_nodes)
+    mappings = mixer._mappings
+    for line in lines:
+        if not line.startswith("/"):
+            continue
+        path, _, text = line.strip().partition(" ")
+        values = _tokens(text)
+        if path in mappings:
+            # A single field written out in full
+            if values:
+                yield path, _value(mappings[path], values[0])
+            continue
+        for pattern, fields in nodes:
+            if pattern.fullmatch(path):
+                for field, value in zip(fields, values):
+                    address_data = mappings.get(f"{path}/{field}")
+                    if address_data:
+                        yield address_data["input"], _value(address_data, value)
+                break
+
+
+def _value(address_data: Dict[str, Any], text: Union[str, Tuple[str]]) -> Any:
+    """Convert the text form of a value to the value sent by the mixer"""
+    if isinstance(text, tuple):
+        return text[0]
+    if address_data.get("data_type", "") in ("boolean", "boolean_inverted"):
+        return 1 if text in ("ON", "1") else 0
+    secondary = address_data.get("secondary_output", {})
+    if "_db" in secondary and "reverse_function" in secondary["_db"]:
+        db = -math.inf if text == "-oo" else float(text)
+        value = getattr(utils, secondary["_db"]["reverse_function"])(db, address_data)
+        return float32(utils.quantize_fader(value, address_data))
+    if "_name" in secondary:
+        return getattr(utils, secondary["_name"]["reverse_function"])(
+            text, address_data
+        )
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def iter_updates(mixer, lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Convert the lines of a scene file to state updates
+
+    Yields:
+        Dict[str, Any]: Updates as passed to the subscription callback, with
+        a property (a state key) and value.
+    """
+    for address, value in iter_messages(mixer, lines):
+        yield from mixer._decode_message(address, [value])
+
+
+def read_scene_file(
+    mixer,
+    source: Union[str, os.PathLike, Iterable[str]],
+    encoding: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Read a scene or snapshot file into a state dictionary
+
+    The file is read a line at a time, so large show files are not held in
+    memory. The result has the same keys as mixer.state(), so it can be
+    compared with mixer.diff() or written with mixer.apply().
+
+    Args:
+        mixer (MixerBase): A mixer of the type the file was saved from, created
+            with create(). It does not need to be started.
+        source (Union[str, os.PathLike, Iterable[str]]): The file name, or an
+            open file or other iterable of lines.
+        encoding (Optional[str]): The encoding of the file, defaults to UTF-8.
+
+    Returns:
+        Dict[str, Any]: The state keys and values found in the file.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding=encoding or "utf-8", errors="replace") as file:
+            return read_scene_file(mixer, file)
+    return {
+        update["property"]: update["value"] for update in iter_updates(mixer, source)
+    }
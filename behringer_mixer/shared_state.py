@@ -0,0 +1,205 @@
+""" Export of the numeric mixer state to shared memory for other processes
+
+The region starts with a fixed header, followed by a JSON description of the
+families (their keys and where their arrays live) and then the arrays
+themselves, copied from the StateStore. A seqlock counter in the header is
+odd while the writer is copying, so readers retry until they see the same
+even value before and after reading, yielding to the writer between tries.
+"""
+
+from array import array
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import struct
+import time
+from .errors import MixerError
+from .state_store import FLAG_INT
+
+_MAGIC = b"BMXSTATE"
+_HEADER = struct.Struct("<8sQQI4x")  # magic, seqlock, state seq, layout size
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 8
+# Readers yield to the writer between tries, sleeping for _READ_BACKOFF after
+# the first _READ_SPINS, and give up after _READ_ATTEMPTS (about a second)
+_READ_ATTEMPTS = 1000
+_READ_SPINS = 10
+_READ_BACKOFF = 0.001
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class SharedStateWriter:
+    """Publishes the numeric families of a StateStore to a shared memory region"""
+
+    def __init__(self, store, name: Optional[str] = None):
+        """Create the shared memory region
+
+        Args:
+            store (StateStore): The state to export.
+            name (Optional[str]): Name of the region, generated if not given.
+        """
+        self.store = store
+        families = []
+        offset = 0
+        for family_name, keys, values, _, decimals in store.iter_families():
+            families.append(
+                {
+                    "name": family_name,
+                    "typecode": values.typecode,
+                    "decimals": decimals,
+                    "keys": keys,
+                    "values": offset,
+                    "flags": _align(offset + values.itemsize * len(keys)),
+                }
+            )
+            offset = _align(families[-1]["flags"] + len(keys))
+        layout = json.dumps({"families": families}).encode()
+        self._data_offset = _align(_HEADER.size + len(layout))
+        self._families = families
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=True, size=self._data_offset + max(offset, 8)
+        )
+        self.name = self.shm.name
+        self._seq = 0
+        self._published_seq = -1
+        _HEADER.pack_into(self.shm.buf, 0, _MAGIC, 0, 0, len(layout))
+        self.shm.buf[_HEADER.size : _HEADER.size + len(layout)] = layout
+
+    def publish(self) -> bool:
+        """Copy the current state into shared memory if it has changed
+
+        Returns:
+            bool: True if the state was copied.
+        """
+        if self.store.seq == self._published_seq:
+            return False
+        buf = self.shm.buf
+        base = self._data_offset
+        self._seq += 1
+        _SEQ.pack_into(buf, _SEQ_OFFSET, self._seq)
+        for family, (_, _, values, flags, _) in zip(
+            self._families, self.store.iter_families()
+        ):
+            start = base + family["values"]
+            data = values.tobytes()
+            buf[start : start + len(data)] = data
+            start = base + family["flags"]
+            buf[start : start + len(flags)] = flags.tobytes()
+        self._published_seq = self.store.seq
+        struct.pack_into("<Q", buf, 16, self.store.seq)
+        self._seq += 1
+        _SEQ.pack_into(buf, _SEQ_OFFSET, self._seq)
+        return True
+
+    async def run(self, interval: float = 0.05) -> None:
+        """Publish changes every interval seconds until cancelled"""
+        while True:
+            self.publish()
+            await asyncio.sleep(interval)
+
+    def close(self) -> None:
+        """Close and remove the shared memory region"""
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SharedStateReader:
+    """Read only access to a state exported by SharedStateWriter, from any process"""
+
+    def __init__(self, name: str):
+        """Attach to an exported state
+
+        Args:
+            name (str): The name of the region, SharedStateWriter.name.
+        """
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching registers the region with the
+            # resource tracker, which would remove it when this process exits
+            from multiprocessing import resource_tracker
+
+            self.shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        magic, _, _, layout_size = _HEADER.unpack_from(self.shm.buf, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{name} is not an exported mixer state")
+        layout = bytes(self.shm.buf[_HEADER.size : _HEADER.size + layout_size])
+        self._families = {
+            family["name"]: family for family in json.loads(layout)["families"]
+        }
+        self._data_offset = _align(_HEADER.size + layout_size)
+
+    @property
+    def seq(self) -> int:
+        """The state sequence number of the last publish"""
+        return struct.unpack_from("<Q", self.shm.buf, 16)[0]
+
+    def families(self) -> List[str]:
+        """Return the names of the exported families"""
+        return list(self._families.keys())
+
+    def _read_consistent(self, names: List[str]):
+        """Copy the arrays of some families, retrying while the writer is busy"""
+        buf = self.shm.buf
+        base = self._data_offset
+        for attempt in range(_READ_ATTEMPTS):
+            if attempt:
+                # Give the writer a chance to finish
+                time.sleep(0 if attempt < _READ_SPINS else _READ_BACKOFF)
+            before = _SEQ.unpack_from(buf, _SEQ_OFFSET)[0]
+            if before % 2:
+                continue
+            copies = []
+            for name in names:
+                family = self._families[name]
+                count = len(family["keys"])
+                values = array(family["typecode"])
+                start = base + family["values"]
+                values.frombytes(buf[start : start + values.itemsize * count])
+                start = base + family["flags"]
+                flags = bytes(buf[start : start + count])
+                copies.append((family, values, flags))
+            if _SEQ.unpack_from(buf, _SEQ_OFFSET)[0] == before:
+                return copies
+        raise MixerError("The shared state is not being updated consistently")
+
+    @staticmethod
+    def _decode(family: Dict[str, Any], values: array, flags: bytes):
+        """Yield the key and value of each entry that is set"""
+        typecode = family["typecode"]
+        decimals = family["decimals"]
+        for index, key in enumerate(family["keys"]):
+            flag = flags[index]
+            if not flag:
+                continue
+            value = values[index]
+            if typecode == "B":
+                value = bool(value)
+            else:
+                if decimals is not None:
+                    value = round(value, decimals)
+                if flag == FLAG_INT:
+                    value = int(value)
+            yield key, value
+
+    def family(self, name: str) -> List[Any]:
+        """Return the values of one family in array order, None where unset"""
+        ((family, values, flags),) = self._read_consistent([name])
+        found = dict(self._decode(family, values, flags))
+        return [found.get(key) for key in family["keys"]]
+
+    def read(self) -> Dict[str, Any]:
+        """Return every exported value that is set"""
+        state = {}
+        for family, values, flags in self._read_consistent(list(self._families)):
+            state.update(self._decode(family, values, flags))
+        return state
+
+    def close(self) -> None:
+        """Detach from the shared memory region"""
+        self.shm.close()
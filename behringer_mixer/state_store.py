@@ -0,0 +1,476 @@
+""" Storage for the mixer state, keeping numeric parameters in typed arrays """
+
+from array import array
+from bisect import bisect_right
+from collections.abc import MutableMapping
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import re
+
+_INDEX_PATTERN = re.compile(r"/(\d+)(?=/|$)")
+
+_MISSING = object()
+
+# Values of the family_present() flags
+FLAG_UNSET = 0
+FLAG_FLOAT = 1
+FLAG_INT = 2
+
+
+def family_name(key: str) -> Tuple[str, Tuple[int, ...]]:
+    """Split an output key into its family name and strip/bus indices
+
+    eg "/chsend/5/3/mix_fader" gives ("/chsend/{}/{}/mix_fader", (5, 3))
+    """
+    indices = tuple(int(number) for number in _INDEX_PATTERN.findall(key))
+    return _INDEX_PATTERN.sub("/{}", key), indices
+
+
+class Changes(dict):
+    """The values changed after a sequence number, from changes_since()
+
+    Attributes:
+        reset (bool): True if the state was cleared after the sequence number.
+            The values are then the whole state, not a delta, and any key not
+            in them has been removed.
+        deleted (List[str]): The keys removed after the sequence number.
+    """
+
+    def __init__(self, values=(), reset: bool = False, deleted=None):
+        super().__init__(values)
+        self.reset = reset
+        self.deleted: List[str] = deleted or []
+
+
+class _Layout:
+    """The slot of every key of a set of mappings.
+
+    Numeric keys come first, grouped by family, followed by every other
+    mapped key. A layout is shared by all the stores built from the same
+    mappings, so a second mixer of a type only pays for its values.
+    """
+
+    __slots__ = ("keys", "slots", "families", "slot_family", "numeric")
+
+    def __init__(self, keys: List[str], families: Tuple[Tuple, ...]):
+        self.keys = keys
+        # In slot order, so iterating the keys gives them in slot order
+        self.slots = {key: slot for slot, key in enumerate(keys)}
+        # (name, typecode, decimals, offset, size) of each numeric family
+        self.families = families
+        self.numeric = sum(family[4] for family in families)
+        self.slot_family = array("H")
+        for number, family in enumerate(families):
+            self.slot_family.extend([number] * family[4])
+
+
+_LAYOUTS: Dict[int, List[_Layout]] = {}
+
+
+def _layout(mappings: Dict[str, Dict[str, Any]]) -> _Layout:
+    """Return the layout of the output keys of the mappings"""
+    typed = {}
+    others = {}
+    for row in mappings.values():
+        output = row.get("output")
+        if not output:
+            continue
+        secondary = row.get("secondary_output", {})
+        if row.get("data_type") in ("boolean", "boolean_inverted"):
+            typed[output] = ("B", None)
+        elif "_db" in secondary and not row.get("mapping"):
+            typed[output] = ("f", None)
+        db_row = secondary.get("_db")
+        if db_row is not None:
+            forward_function = db_row.get("forward_function")
+            if forward_function == "fader_to_db":
+                typed[output + "_db"] = ("f", 1)
+            elif forward_function is None:
+                typed[output + "_db"] = ("f", None)
+        for key in [output] + [output + suffix for suffix in secondary]:
+            others[key] = None
+    grouped: Dict[str, Tuple[str, Optional[int], List]] = {}
+    for key, (typecode, decimals) in typed.items():
+        name, indices = family_name(key)
+        group = grouped.setdefault(name, (typecode, decimals, []))
+        if group[:2] == (typecode, decimals):
+            group[2].append((indices, key))
+            del others[key]
+    keys: List[str] = []
+    families = []
+    for name, (typecode, decimals, members) in grouped.items():
+        families.append((name, typecode, decimals, len(keys), len(members)))
+        keys.extend(key for _, key in sorted(members))
+    keys.extend(others)
+    families = tuple(families)
+    layouts = _LAYOUTS.setdefault(hash((tuple(keys), families)), [])
+    for layout in layouts:
+        if layout.families == families and list(layout.slots) == keys:
+            return layout
+    layouts.append(_Layout(keys, families))
+    return layouts[-1]
+
+
+class _Family:
+    """Contiguous array holding one numeric parameter for every strip/bus
+
+    Its keys are slots offset to offset + size - 1 of the layout. Each entry
+    also records the sequence number of its last change, and changed the
+    latest of them, so unchanged families are skipped by changes_since().
+    """
+
+    __slots__ = (
+        "name",
+        "typecode",
+        "decimals",
+        "offset",
+        "size",
+        "values",
+        "flags",
+        "seqs",
+        "changed",
+    )
+
+    def __init__(
+        self, name: str, typecode: str, decimals: Optional[int], offset: int, size: int
+    ):
+        self.name = name
+        self.typecode = typecode
+        self.decimals = decimals
+        self.offset = offset
+        self.size = size
+        self.values = array(typecode, bytes(array(typecode).itemsize * size))
+        self.flags = array("B", bytes(size))
+        self.seqs = array("Q", bytes(8 * size))
+        self.changed = 0
+
+    def store(self, index: int, value: Any) -> bool:
+        """Store a value, returning False if it cannot be held exactly"""
+        value_type = type(value)
+        if self.typecode == "B":
+            if value_type is not bool:
+                return False
+            self.values[index] = value
+            self.flags[index] = FLAG_FLOAT
+            return True
+        if value_type is not float and value_type is not int:
+            return False
+        try:
+            self.values[index] = value
+        except OverflowError:
+            return False
+        stored = self.values[index]
+        if self.decimals is not None:
+            stored = round(stored, self.decimals)
+        if stored != value:
+            return False
+        self.flags[index] = FLAG_INT if value_type is int else FLAG_FLOAT
+        return True
+
+    def load(self, index: int) -> Any:
+        """Read the value stored at an index"""
+        value = self.values[index]
+        if self.typecode == "B":
+            return bool(value)
+        if self.decimals is not None:
+            value = round(value, self.decimals)
+        return int(value) if self.flags[index] == FLAG_INT else value
+
+
+class StateStore(MutableMapping):
+    """Mixer state keyed by output key.
+
+    Faders, dB levels, on flags and send levels are held in float32/uint8
+    arrays, one per parameter family (eg "/ch/{}/mix_fader"), indexed by
+    strip and bus. The other mapped keys are held in a list, and anything
+    else, or any value that cannot be held exactly in its family's array,
+    in a plain dict. The key to slot index is shared by all the stores of
+    a mixer type.
+
+    Every change is stamped with a monotonically increasing sequence number
+    so consumers can fetch only what changed since they last looked. The
+    slots changed recently are also logged in sequence order, so a consumer
+    that keeps up only visits the entries that changed.
+    """
+
+    def __init__(self, mappings: Optional[Dict[str, Dict[str, Any]]] = None):
+        layout = _layout(mappings or {})
+        self._layout = layout
+        self._slots = layout.slots
+        self._slot_family = layout.slot_family
+        self._numeric = layout.numeric
+        self._family_list = [_Family(*family) for family in layout.families]
+        self._families: Dict[str, _Family] = {
+            family.name: family for family in self._family_list
+        }
+        others = len(layout.slots) - layout.numeric
+        self._objects: List[Any] = [_MISSING] * others
+        self._object_seqs = array("Q", bytes(8 * others))
+        self._objects_changed = 0
+        self._values: Dict[str, Any] = {}
+        # Sequence numbers of the values in the dict, oldest change first
+        self._value_seqs: Dict[str, int] = {}
+        # The slots changed after _dirty_floor and the sequence number of each
+        # change, trimmed to the latest _dirty_size once twice as long
+        self._dirty_slots = array("I")
+        self._dirty_seqs = array("Q")
+        self._dirty_floor = 0
+        self._dirty_size = max(64, len(layout.slots) // 4)
+        self._count = 0
+        self.seq = 0
+        self.cleared_seq = 0
+
+    def __getitem__(self, key: str) -> Any:
+        slot = self._slots.get(key)
+        if slot is not None:
+            if slot >= self._numeric:
+                value = self._objects[slot - self._numeric]
+                if value is not _MISSING:
+                    return value
+            else:
+                family = self._family_list[self._slot_family[slot]]
+                index = slot - family.offset
+                if family.flags[index]:
+                    return family.load(index)
+        return self._values[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        previous = self.get(key, _MISSING)
+        if previous is not _MISSING and type(previous) is type(value):
+            if previous == value:
+                return
+        self.seq += 1
+        self._store(key, value)
+
+    def _store(self, key: str, value: Any) -> None:
+        """Store a value in its slot, or in the dict"""
+        slot = self._slots.get(key)
+        if slot is not None:
+            if slot >= self._numeric:
+                index = slot - self._numeric
+                if self._objects[index] is _MISSING:
+                    self._count += 1
+                self._objects[index] = value
+                self._object_seqs[index] = self._objects_changed = self.seq
+                self._mark(slot)
+                return
+            family = self._family_list[self._slot_family[slot]]
+            index = slot - family.offset
+            was_set = family.flags[index] != FLAG_UNSET
+            if family.store(index, value):
+                family.seqs[index] = family.changed = self.seq
+                self._mark(slot)
+                if was_set:
+                    return
+                if key in self._values:
+                    del self._values[key]
+                    del self._value_seqs[key]
+                else:
+                    self._count += 1
+                return
+            if was_set:
+                family.flags[index] = FLAG_UNSET
+                family.seqs[index] = family.changed = self.seq
+                self._mark(slot)
+                self._count -= 1
+        if key not in self._values:
+            self._count += 1
+        self._values[key] = value
+        value_seqs = self._value_seqs
+        value_seqs.pop(key, None)
+        value_seqs[key] = self.seq
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self.seq += 1
+        self._count -= 1
+        slot = self._slots.get(key)
+        if slot is not None:
+            if slot >= self._numeric:
+                index = slot - self._numeric
+                if self._objects[index] is not _MISSING:
+                    self._objects[index] = _MISSING
+                    self._object_seqs[index] = self._objects_changed = self.seq
+                    self._mark(slot)
+                    return
+            else:
+                family = self._family_list[self._slot_family[slot]]
+                index = slot - family.offset
+                if family.flags[index]:
+                    family.flags[index] = FLAG_UNSET
+                    family.seqs[index] = family.changed = self.seq
+                    self._mark(slot)
+                    return
+        # The sequence number is kept to report the deletion
+        del self._values[key]
+        del self._value_seqs[key]
+        self._value_seqs[key] = self.seq
+
+    def _mark(self, slot: int) -> None:
+        """Log a change of a slot at the current sequence number"""
+        self._dirty_slots.append(slot)
+        self._dirty_seqs.append(self.seq)
+        if len(self._dirty_seqs) >= 2 * self._dirty_size:
+            # Consumers further behind than the log fall back to a full scan
+            drop = len(self._dirty_seqs) - self._dirty_size
+            self._dirty_floor = self._dirty_seqs[drop - 1]
+            del self._dirty_slots[:drop]
+            del self._dirty_seqs[:drop]
+
+    def __iter__(self) -> Iterator[str]:
+        keys = iter(self._slots)
+        for family in self._family_list:
+            flags = family.flags
+            for index in range(family.size):
+                key = next(keys)
+                if flags[index]:
+                    yield key
+        for key, value in zip(keys, self._objects):
+            if value is not _MISSING:
+                yield key
+        yield from self._values
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    def clear(self) -> None:
+        """Remove every value, keeping the allocated arrays"""
+        for family in self._family_list:
+            family.flags[:] = array("B", bytes(family.size))
+        self._objects[:] = [_MISSING] * len(self._objects)
+        self._values.clear()
+        self._value_seqs.clear()
+        self._count = 0
+        self.seq += 1
+        self.cleared_seq = self._dirty_floor = self.seq
+        del self._dirty_slots[:]
+        del self._dirty_seqs[:]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a copy of the state as a plain dict"""
+        return dict(self.items())
+
+    def changes_since(self, seq: int) -> Tuple[Changes, int]:
+        """Return the values changed and keys removed after a sequence number
+
+        Args:
+            seq (int): The high-water mark returned by the previous call, or 0.
+
+        Returns:
+            Tuple[Changes, int]: The changed values and the new high-water mark.
+            If the state was cleared after seq, the changes are flagged as a
+            reset and hold every current value.
+        """
+        if seq < self.cleared_seq:
+            return Changes(self.items(), reset=True), self.seq
+        changes = Changes()
+        deleted = []
+        if seq >= self._dirty_floor:
+            self._logged_changes(seq, changes, deleted)
+        else:
+            self._scanned_changes(seq, changes, deleted)
+        value_seqs = self._value_seqs
+        values = self._values
+        for key in reversed(value_seqs):
+            if value_seqs[key] <= seq:
+                break
+            if key in values:
+                changes[key] = values[key]
+            else:
+                deleted.append(key)
+        # A numeric key moved to the dict leaves its array entry unset
+        changes.deleted = [key for key in deleted if key not in changes]
+        return changes, self.seq
+
+    def _logged_changes(self, seq: int, changes: Changes, deleted: List[str]) -> None:
+        """Collect the slots changed after seq from the log of changed slots"""
+        start = bisect_right(self._dirty_seqs, seq)
+        keys = self._layout.keys
+        numeric = self._numeric
+        for slot in dict.fromkeys(islice(self._dirty_slots, start, None)):
+            key = keys[slot]
+            if slot >= numeric:
+                value = self._objects[slot - numeric]
+                if value is not _MISSING:
+                    changes[key] = value
+                else:
+                    deleted.append(key)
+                continue
+            family = self._family_list[self._slot_family[slot]]
+            index = slot - family.offset
+            if family.flags[index]:
+                changes[key] = family.load(index)
+            else:
+                deleted.append(key)
+
+    def _scanned_changes(self, seq: int, changes: Changes, deleted: List[str]) -> None:
+        """Collect the slots changed after seq by scanning the changed families"""
+        for family in self._family_list:
+            if family.changed <= seq:
+                continue
+            seqs = family.seqs
+            flags = family.flags
+            keys = self._keys_of(family.offset, family.size)
+            for index, key in enumerate(keys):
+                if seqs[index] > seq:
+                    if flags[index]:
+                        changes[key] = family.load(index)
+                    else:
+                        deleted.append(key)
+        if self._objects_changed > seq:
+            seqs = self._object_seqs
+            keys = self._keys_of(self._numeric, len(self._objects))
+            for index, (key, value) in enumerate(zip(keys, self._objects)):
+                if seqs[index] > seq:
+                    if value is not _MISSING:
+                        changes[key] = value
+                    else:
+                        deleted.append(key)
+
+    def _keys_of(self, offset: int, size: int) -> Iterator[str]:
+        """Return the keys of a range of slots"""
+        return islice(self._slots, offset, offset + size)
+
+    def families(self) -> List[str]:
+        """Return the names of the numeric families, eg "/ch/{}/mix_fader" """
+        return list(self._families.keys())
+
+    def iter_families(
+        self,
+    ) -> Iterator[Tuple[str, List[str], array, array, Optional[int]]]:
+        """Yield (name, keys, values, flags, decimals) of each numeric family
+
+        values and flags are the live arrays returned by family_array() and
+        family_present(), decimals is the rounding applied when reading values.
+        """
+        for name, family in self._families.items():
+            keys = list(self._keys_of(family.offset, family.size))
+            yield name, keys, family.values, family.flags, family.decimals
+
+    def family_keys(self, name: str) -> List[str]:
+        """Return the output keys of a family in array order"""
+        family = self._families[name]
+        return list(self._keys_of(family.offset, family.size))
+
+    def family_array(self, name: str) -> array:
+        """Return the live array of a family ("f" float32 or "B" uint8)
+
+        Entries whose family_present() flag is 0 have not been received, or
+        hold a value that could not be stored in the array.
+        """
+        return self._families[name].values
+
+    def family_present(self, name: str) -> array:
+        """Return the uint8 array flagging which entries of a family are set"""
+        return self._families[name].flags
+
+    def family_values(self, name: str) -> List[Any]:
+        """Return the values of a family in array order, None where unset"""
+        return [self.get(key) for key in self.family_keys(name)]
@@ -0,0 +1,219 @@
+""" Synchronous, thread-safe interface running the mixer on a background event loop """
+
+from collections import deque
+from concurrent.futures import CancelledError, Future
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional
+import asyncio
+import threading
+from .mixer_api import create
+
+
+class SyncMixer:
+    """Blocking interface to a mixer for synchronous code (Flask, MIDI threads, Qt etc).
+
+    The mixer runs on an event loop in a dedicated thread. Calls from other
+    threads are queued and the loop is woken at most once per batch of
+    submissions. State is read from an immutable snapshot that is swapped
+    atomically as changes arrive, so readers never take a lock.
+    """
+
+    def __init__(self, mixer_type: str, snapshot_interval: float = 0.05, **kwargs):
+        """Create the mixer and start its event loop thread
+
+        Args:
+            mixer_type (str): The mixer type, as for mixer_api.create.
+            snapshot_interval (float): How often the state snapshot is refreshed.
+            **kwargs: Passed to mixer_api.create.
+        """
+        self.mixer = create(mixer_type, **kwargs)
+        self.snapshot_interval = snapshot_interval
+        self._snapshot: Mapping[str, Any] = MappingProxyType({})
+        self._seq = 0
+        self._submissions = deque()
+        self._lock = threading.Lock()
+        self._wakeup_pending = False
+        self._publish_pending = False
+        self._subscription = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, name="behringer-mixer", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        """Run the event loop on the background thread"""
+        asyncio.set_event_loop(self._loop)
+        self._loop.create_task(self._publish_worker())
+        try:
+            self._loop.run_forever()
+        finally:
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(
+                asyncio.gather(*tasks, return_exceptions=True)
+            )
+            self._loop.close()
+
+    def submit(self, coroutine_function: Callable, *args, **kwargs) -> Future:
+        """Run a coroutine function on the mixer's event loop
+
+        Args:
+            coroutine_function (Callable): eg mixer.set_value
+            *args: Arguments for the coroutine function.
+            **kwargs: Keyword arguments for the coroutine function.
+
+        Returns:
+            Future: A concurrent.futures.Future for the result.
+        """
+        future = Future()
+        with self._lock:
+            self._submissions.append((coroutine_function, args, kwargs, future))
+            if self._wakeup_pending:
+                return future
+            self._wakeup_pending = True
+        self._loop.call_soon_threadsafe(self._drain)
+        return future
+
+    def call(self, coroutine_function: Callable, *args, timeout=None, **kwargs):
+        """Run a coroutine function on the mixer's event loop and wait for the result"""
+        return self.submit(coroutine_function, *args, **kwargs).result(timeout)
+
+    def _drain(self):
+        """Start every queued submission, called on the event loop"""
+        with self._lock:
+            self._wakeup_pending = False
+            submissions = list(self._submissions)
+            self._submissions.clear()
+        for coroutine_function, args, kwargs, future in submissions:
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                task = self._loop.create_task(coroutine_function(*args, **kwargs))
+            except Exception as err:
+                future.set_exception(err)
+                continue
+            task.add_done_callback(
+                lambda task, future=future: self._complete(task, future)
+            )
+
+    def _complete(self, task: asyncio.Task, future: Future):
+        """Refresh the snapshot and copy the result of a task to its future"""
+        self._publish()
+        if task.cancelled():
+            future.set_exception(CancelledError())
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def _schedule_publish(self):
+        """Refresh the snapshot once the current loop iteration is done"""
+        if not self._publish_pending:
+            self._publish_pending = True
+            self._loop.call_soon(self._publish)
+
+    def _publish(self):
+        """Swap in a new snapshot if the state has changed"""
+        self._publish_pending = False
+        store = self.mixer.state()
+        changes, seq = store.changes_since(self._seq)
+        if seq == self._seq:
+            return
+        if changes.reset:
+            snapshot = dict(changes)
+        else:
+            snapshot = dict(self._snapshot)
+            snapshot.update(changes)
+            for key in changes.deleted:
+                snapshot.pop(key, None)
+        self._seq = seq
+        self._snapshot = MappingProxyType(snapshot)
+
+    async def _publish_worker(self):
+        """Pick up changes that did not come through a call or the subscription"""
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            self._publish()
+
+    def state(self, key: Optional[str] = None) -> Any:
+        """Return the latest snapshot of the state, or the value of one key
+
+        Safe to call from any thread without locking.
+        """
+        snapshot = self._snapshot
+        if key:
+            return snapshot.get(key)
+        return snapshot
+
+    def start(self, timeout=None) -> bool:
+        """Start communication with the mixer"""
+        return self.call(self.mixer.start, timeout=timeout)
+
+    def reload(self, timeout=None, **kwargs) -> Dict[str, Any]:
+        """Reload the state from the mixer"""
+        return self.call(self.mixer.reload, timeout=timeout, **kwargs)
+
+    def get(self, key: str, max_age: Optional[float] = None, timeout=None) -> Any:
+        """Return the value of a key, querying the mixer if it is stale"""
+        return self.call(self.mixer.get, key, max_age, timeout=timeout)
+
+    def set_value(
+        self,
+        address: str,
+        value: Any,
+        optimistic: Optional[bool] = None,
+        timeout=None,
+    ) -> None:
+        """Set a value on the mixer"""
+        return self.call(
+            self.mixer.set_value, address, value, optimistic, timeout=timeout
+        )
+
+    def apply(
+        self,
+        target: Dict[str, Any],
+        verify: bool = True,
+        retries: int = 2,
+        read_retries: int = 3,
+        timeout=None,
+    ) -> Dict[str, Any]:
+        """Write the values of a target state that differ from the mixer"""
+        return self.call(
+            self.mixer.apply, target, verify, retries, read_retries, timeout=timeout
+        )
+
+    def load_scene(self, scene_number, timeout=None):
+        """Load a scene on the mixer"""
+        return self.call(self.mixer.load_scene, scene_number, timeout=timeout)
+
+    def subscribe(self, callback_function: Optional[Callable] = None) -> None:
+        """Subscribe to updates from the mixer
+
+        The callback function, if given, is called on the mixer's thread and
+        must not block.
+        """
+
+        def updates(data):
+            self._schedule_publish()
+            if callback_function:
+                callback_function(data)
+
+        self._subscription = self.submit(self.mixer.subscribe, updates)
+
+    def stop(self, timeout=None) -> None:
+        """Stop the mixer and its event loop thread"""
+        if self._subscription:
+            self.call(self.mixer.unsubscribe, timeout=timeout)
+            self._subscription = None
+        if self.mixer.server:
+            self.call(self.mixer.stop, timeout=timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
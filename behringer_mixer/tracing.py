@@ -0,0 +1,157 @@
+""" Lightweight tracing of the send and receive paths into a ring buffer """
+
+from typing import Any, Iterable, List, Optional, Tuple, Union
+import logging
+import time
+
+SEND = "send"
+RECEIVE = "receive"
+DECODE = "decode"
+CALLBACK = "callback"
+ERROR = "error"
+
+
+class Tracer:
+    """Records timestamped events into a fixed size ring buffer.
+
+    Events are (timestamp_ns, event, address, value), timestamps from
+    time.monotonic_ns():
+
+    - send: a message was sent, value is the size of the datagram
+    - receive: a datagram arrived, value is its size
+    - decode: a message was decoded and handled, value is the time in ns since
+      its datagram arrived
+    - callback: the subscription callback returned, value is its duration in ns
+    - error: the subscription callback raised, value is the exception
+
+    Received datagrams are sampled as a whole, so the decode and callback
+    events of a sampled datagram are all recorded. When the tracer is not
+    installed the mixer only pays for an "is not None" check.
+    """
+
+    logger = logging.getLogger("behringermixer.tracing")
+
+    def __init__(
+        self,
+        size: int = 4096,
+        sample: float = 1.0,
+        prefixes: Optional[Union[str, Iterable[str]]] = None,
+        dump_on_error: bool = True,
+    ):
+        """Initialize the tracer
+
+        Args:
+            size (int): The number of events kept.
+            sample (float): The fraction of messages traced, eg 0.01 for one in 100.
+            prefixes (Optional[Union[str, Iterable[str]]]): Only trace messages
+                whose address starts with one of these, eg "/ch/01/".
+            dump_on_error (bool): Log the buffer when the subscription callback
+                raises.
+        """
+        self.size = size
+        self.sample = sample
+        if isinstance(prefixes, str):
+            prefixes = [prefixes]
+        self.prefixes = tuple(prefixes) if prefixes else None
+        self.dump_on_error = dump_on_error
+        self._events: List[Optional[Tuple[int, str, Any, Any]]] = [None] * size
+        self._next = 0
+        # Sends and receives are sampled separately, so mixed traffic does
+        # not starve either direction
+        self._credit = {SEND: 0.0, RECEIVE: 0.0}
+        self._sampled = False
+        self.arrival = 0
+
+    def _take_sample(self, event: str) -> bool:
+        """Return True for the sample fraction of calls for an event, evenly spread"""
+        credit = self._credit[event] + self.sample
+        # Allow for rounding, ten lots of 0.1 add up to just under 1
+        if credit < 1 - 1e-9:
+            self._credit[event] = credit
+            return False
+        self._credit[event] = credit - 1
+        return True
+
+    def record(self, event: str, address: Optional[str], value: Any = None) -> None:
+        """Append an event to the buffer, overwriting the oldest"""
+        self._events[self._next % self.size] = (
+            time.monotonic_ns(),
+            event,
+            address,
+            value,
+        )
+        self._next += 1
+
+    def wants(self, address: str) -> bool:
+        """Return True if messages for an address pass the prefix filter"""
+        return self.prefixes is None or address.startswith(self.prefixes)
+
+    def sent(self, address: str, size: int) -> None:
+        """Record a sent message"""
+        if self.wants(address) and self._take_sample(SEND):
+            self.record(SEND, address, size)
+
+    def received(self, size: int) -> None:
+        """Record the arrival of a datagram, deciding whether it is sampled"""
+        self.arrival = time.monotonic_ns()
+        self._sampled = self._take_sample(RECEIVE)
+        if self._sampled and self.prefixes is None:
+            self.record(RECEIVE, None, size)
+
+    def decoded(self, address: str) -> bool:
+        """Record a decoded message, returning True if it is being traced"""
+        if not self._sampled or not self.wants(address):
+            return False
+        self.record(DECODE, address, time.monotonic_ns() - self.arrival)
+        return True
+
+    def events(self) -> List[Tuple[int, str, Any, Any]]:
+        """Return the buffered events, oldest first"""
+        return self.events_since(0)[0]
+
+    def events_since(self, cursor: int) -> Tuple[List[Tuple[int, str, Any, Any]], int]:
+        """Return the events recorded after a cursor, and the new cursor
+
+        Args:
+            cursor (int): The cursor returned by the previous call, or 0.
+
+        Returns:
+            Tuple[List[Tuple[int, str, Any, Any]], int]: The events, oldest first,
+            without any that have been overwritten since, and the new cursor.
+        """
+        start = max(cursor, self._next - self.size)
+        events = self._events
+        size = self.size
+        return [events[index % size] for index in range(start, self._next)], self._next
+
+    def clear(self) -> None:
+        """Remove every buffered event"""
+        self._events = [None] * self.size
+        self._next = 0
+
+    def dump(self, logger: Optional[logging.Logger] = None) -> str:
+        """Format the buffered events, logging them if a logger is given
+
+        Times are in milliseconds relative to the last event.
+        """
+        events = self.events()
+        if not events:
+            return ""
+        last = events[-1][0]
+        lines = []
+        for timestamp, event, address, value in events:
+            if event in (DECODE, CALLBACK):
+                value = f"{value / 1e6:.3f}ms"
+            lines.append(
+                f"{(timestamp - last) / 1e6:12.3f} {event:<8} {address or ''} {value}"
+            )
+        text = "\n".join(lines)
+        if logger:
+            logger.warning("Trace of the last %s events:\n%s", len(events), text)
+        return text
+
+    def error(self, address: str, err: Exception) -> None:
+        """Record an error raised by the callback and dump the buffer if enabled"""
+        self.record(ERROR, address, repr(err))
+        if self.dump_on_error:
+            self.dump(self.logger)
@@ -29,6 +29,26 @@ def db_to_fader(value, config):
     return 0
 
 
+# X32 and XAir faders have 1024 positions
+FADER_STEPS = 1023
+
+
+def quantize_fader(value, config):
+    """Round a fader value to the nearest position the mixer stores
+
+    A mapping can set the number of steps in its data_type_config, eg send
+    levels, and linear faders with a step, eg headamp gain, have
+    (max - min) / step of them.
+    """
+    steps = FADER_STEPS
+    type_config = config.get("data_type_config") if config else None
+    if type_config and type_config.get("steps"):
+        steps = type_config["steps"]
+    elif type_config and type_config.get("step"):
+        steps = round((type_config["max"] - type_config["min"]) / type_config["step"])
+    return round(min(1.0, max(0.0, value)) * steps) / steps
+
+
 _colors = [
     "OFF",
     "RD",
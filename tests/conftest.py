@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+import struct
+from behringer_mixer import mixer_api
+
+
+class FakeServer:
+    """Stands in for the OSC client of a mixer
+
+    Writes are stored, unless the address is in rejected, and queries are
+    answered from the stored values the way the mixer replies to them.
+    """
+
+    def __init__(self, mixer):
+        self.mixer = mixer
+        self.sent = []
+        self.values = {}
+        self.rejected = set()
+        # Called with the value written to the address, eg to load a scene
+        self.actions = {}
+        # Reply to queries of unknown addresses with this value
+        self.default = None
+        # Number of queries to leave unanswered, like lost packets
+        self.drop = 0
+        self.queries = 0
+
+    def send_message(self, address, value):
+        self.sent.append((address, value))
+        if value is not None:
+            if address in self.actions:
+                self.actions[address](value)
+            elif address not in self.rejected:
+                self.values[address] = value
+            return
+        self.queries += 1
+        if self.drop:
+            self.drop -= 1
+            return
+        reply = self.values.get(address, self.default)
+        if reply is None:
+            return
+        # A list is sent as the arguments of the reply, eg for /xinfo
+        arguments = reply if isinstance(reply, list) else [reply]
+        # Floats arrive as 32 bit floats
+        arguments = [
+            (
+                struct.unpack("<f", struct.pack("<f", argument))[0]
+                if type(argument) is float
+                else argument
+            )
+            for argument in arguments
+        ]
+        loop = asyncio.get_running_loop()
+        loop.call_soon(self.mixer.msg_handler, address, *arguments)
+
+
+@pytest.fixture
+def fake_mixer():
+    """Create mixers that talk to a FakeServer instead of the network
+
+    The values passed are known to both the mixer and the fake server.
+    """
+
+    def create(mixer_type="XR12", values=None, **kwargs):
+        mixer = mixer_api.create(mixer_type, ip="127.0.0.1", delay=0, **kwargs)
+        mixer.server = FakeServer(mixer)
+        for address, value in (values or {}).items():
+            mixer.server.values[address] = value
+            mixer._update_state(address, [value])
+        return mixer
+
+    return create
@@ -0,0 +1,134 @@
+import pytest
+from behringer_mixer.errors import MixerError
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def _mixer(fake_mixer):
+    values = {}
+    for number in range(1, 5):
+        values[f"/ch/{number:02}/mix/fader"] = 0.5
+        values[f"/ch/{number:02}/mix/on"] = 1
+        values[f"/ch/{number:02}/config/name"] = f"Ch {number}"
+    return fake_mixer(values=values)
+
+
+def test_diff_only_returns_changes(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    target = mixer.state().to_dict()
+    assert mixer.diff(target) == {}
+    target["/ch/1/mix_fader"] = 0.25
+    target["/ch/2/mix_on"] = False
+    target["/ch/3/config_name"] = "Vocal"
+    target["/ch/4/mix_fader_db"] = -20
+    target["/unknown"] = 1
+    changes = mixer.diff(target)
+    # The unchanged fader key of channel 4 is used in preference to its dB key
+    assert changes == {
+        "/ch/1/mix_fader": 0.25,
+        "/ch/2/mix_on": False,
+        "/ch/3/config_name": "Vocal",
+    }
+    del target["/ch/4/mix_fader"]
+    assert mixer.diff(target)["/ch/4/mix_fader_db"] == -20
+
+
+@pytest.mark.asyncio
+async def test_apply_sends_one_write_per_change(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    target = mixer.state().to_dict()
+    target["/ch/1/mix_fader"] = 0.25
+    target["/ch/2/mix_on"] = False
+    target["/ch/3/config_name"] = "Vocal"
+    report = await mixer.apply(target)
+    assert report == {"changes": 3, "writes": 3, "unverified": []}
+    writes = [message for message in mixer.server.sent if message[1] is not None]
+    assert sorted(writes) == [
+        ("/ch/01/mix/fader", 0.25),
+        ("/ch/02/mix/on", 0),
+        ("/ch/03/config/name", "Vocal"),
+    ]
+    assert mixer.diff(target) == {}
+    assert mixer.state("/ch/3/config_name") == "Vocal"
+
+
+@pytest.mark.asyncio
+async def test_apply_reports_values_the_mixer_refused(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    mixer.server.rejected.add("/ch/01/mix/fader")
+    target = {"/ch/1/mix_fader": 0.25, "/ch/2/mix_fader": 0.75}
+    report = await mixer.apply(target, retries=1)
+    assert report == {
+        "changes": 2,
+        "writes": 3,
+        "unverified": ["/ch/1/mix_fader"],
+    }
+    assert mixer.state("/ch/2/mix_fader") == 0.75
+
+
+@pytest.mark.asyncio
+async def test_apply_leaves_status_alone(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    status = {
+        "/-stat/tape/state": 0,
+        "/-stat/tape/file": "show.wav",
+        "/-stat/usbmounted": 1,
+        "/-snap/index": 3,
+        "/-show/showfile/show/name": "Show",
+    }
+    for address, value in status.items():
+        mixer.server.values[address] = value
+        mixer._update_state(address, [value])
+    mixer._update_state("/xinfo", ["192.168.1.10", "XR12-00-00-00", "XR12", "1.22"])
+    target = mixer.state().to_dict()
+    # A snapshot taken while the USB player was running on another scene
+    target["/usb/state"] = "PLAY"
+    target["/usb/file"] = "other.wav"
+    target["/usb/mounted"] = False
+    target["/scene/current"] = 7
+    target["/show/name"] = "Other"
+    target["/status"] = "old"
+    target["/ch/1/mix_fader"] = 0.25
+    assert mixer.diff(target) == {"/ch/1/mix_fader": 0.25}
+    report = await mixer.apply(target)
+    assert report == {"changes": 1, "writes": 1, "unverified": []}
+    sent = {address for address, _ in mixer.server.sent}
+    assert sent == {"/ch/01/mix/fader"}
+
+
+@pytest.mark.asyncio
+async def test_apply_converges_on_the_fader_steps(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    server = mixer.server
+
+    def store(value):
+        # The mixer keeps the nearest of its fader positions
+        server.values["/ch/01/mix/fader"] = round(value * 1023) / 1023
+
+    server.actions["/ch/01/mix/fader"] = store
+    report = await mixer.apply({"/ch/1/mix_fader_db": -20})
+    assert report == {"changes": 1, "writes": 1, "unverified": []}
+    assert mixer.diff({"/ch/1/mix_fader_db": -20}) == {}
+
+
+@pytest.mark.asyncio
+async def test_apply_rejects_invalid_values_before_writing(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    target = {"/ch/1/mix_fader": 0.25, "/ch/2/mix_fader_db": "loud"}
+    with pytest.raises(MixerError, match="/ch/2/mix_fader_db"):
+        await mixer.apply(target)
+    mixer = fake_mixer("X32")
+    target = {"/ch/1/mix_fader": 0.25, "/config/cards/XUSBmode": "96kHz"}
+    with pytest.raises(MixerError, match="/config/cards/XUSBmode"):
+        await mixer.apply(target)
+    assert not mixer.server.sent
+
+
+@pytest.mark.asyncio
+async def test_apply_read_retries(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    # The first read-back is lost, the second is answered without rewriting
+    mixer.server.drop = 1
+    report = await mixer.apply({"/ch/1/mix_fader": 0.25}, retries=0, read_retries=1)
+    assert report == {"changes": 1, "writes": 1, "unverified": []}
+    assert mixer.server.queries == 2
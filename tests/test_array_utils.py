@@ -0,0 +1,67 @@
+import pytest
+from behringer_mixer.utils import fader_to_db, db_to_fader, linf_to_db, db_to_linf
+
+np = pytest.importorskip("numpy")
+from behringer_mixer.array_utils import (  # noqa: E402
+    fader_to_db_array,
+    db_to_fader_array,
+    linf_to_db_array,
+    db_to_linf_array,
+    quantize_x32_fader,
+    x32_fader_table,
+    x32_fader_to_db,
+)
+
+
+def sample_faders():
+    rng = np.random.default_rng(1)
+    steps = np.arange(1024) / 1023
+    return np.concatenate(
+        [
+            steps,
+            steps.astype(np.float32).astype(np.float64),
+            rng.random(20000),
+            np.array([-1.0, 0.0, 0.0625, 0.25, 0.5, 1.0, 100.0, np.nan]),
+        ]
+    )
+
+
+def test_fader_to_db_array_matches_scalar():
+    values = sample_faders()
+    expected = [fader_to_db(float(value), {}) for value in values]
+    assert fader_to_db_array(values).tolist() == expected
+
+
+def test_db_to_fader_array_matches_scalar():
+    values = np.concatenate(
+        [np.linspace(-100, 20, 12001), np.array([-np.inf, np.inf, np.nan])]
+    )
+    expected = [db_to_fader(float(value), {}) for value in values]
+    assert db_to_fader_array(values).tolist() == expected
+
+
+def test_array_shape_is_kept():
+    values = np.full((32, 16), 0.75)
+    assert fader_to_db_array(values).shape == (32, 16)
+    assert fader_to_db_array(0.75) == 0
+
+
+@pytest.mark.parametrize("min, max", [(-12, 60), (-144, 10)])
+def test_linf_array_matches_scalar(min, max):
+    config = {"data_type_config": {"min": min, "max": max}}
+    values = np.linspace(0, 1, 1001)
+    assert linf_to_db_array(values, config).tolist() == [
+        linf_to_db(float(value), config) for value in values
+    ]
+    dbs = linf_to_db_array(values, config)
+    assert db_to_linf_array(dbs, config).tolist() == [
+        db_to_linf(float(value), config) for value in dbs
+    ]
+
+
+def test_x32_fader_table():
+    faders, dbs = x32_fader_table()
+    assert len(faders) == len(dbs) == 1024
+    assert dbs.tolist() == [fader_to_db(float(value), {}) for value in faders]
+    assert x32_fader_to_db(faders).tolist() == dbs.tolist()
+    assert quantize_x32_fader([0.7502, 2.0]).tolist() == [faders[767], 1.0]
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import pytest
+from behringer_mixer.audit import ConsistencyAuditor
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def _mixer(fake_mixer):
+    mixer = fake_mixer()
+    mixer._CONNECT_TIMEOUT = 0.05
+    for address in mixer._mappings:
+        value = 0.5 if address.endswith(("fader", "level")) else 1
+        mixer.server.values[address] = value
+        mixer._update_state(address, [value])
+    return mixer
+
+
+def _queried(mixer):
+    return [address for address, value in mixer.server.sent if value is None]
+
+
+@pytest.mark.asyncio
+async def test_audit_repairs_drift(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    console = mixer.server.values
+    console["/ch/01/mix/on"] = 0
+    console["/ch/02/mix/fader"] = 0.25
+    del console["/ch/03/mix/fader"]
+    auditor = ConsistencyAuditor(mixer, batch=4)
+    assert await auditor.audit_batch() == 4
+    assert _queried(mixer) == mixer.reload_addresses()[:4]
+    while auditor.cycles == 0:
+        await auditor.audit_batch()
+    assert mixer.state("/ch/1/mix_on") is False
+    assert mixer.state("/ch/2/mix_fader_db") == -30.0
+    stats = auditor.stats()
+    assert sorted(_queried(mixer)) == sorted(mixer._mappings)
+    assert stats["drifted"] == 2
+    assert stats["no_reply"] == 1
+    assert stats["audited"] == len(mixer._mappings) - 1
+    assert stats["last_cycle_drift_rate"] == 2 / (len(mixer._mappings) - 1)
+    assert sorted(stats["recent_drift"]) == ["/ch/01/mix/on", "/ch/02/mix/fader"]
+
+
+@pytest.mark.asyncio
+async def test_updates_during_a_batch_are_not_drift(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    server = mixer.server
+    first, second = mixer.reload_addresses()[:2]
+    send_message = server.send_message
+
+    def send_with_update(address, value):
+        if address == first and value is None:
+            # The console moves while the batch is being queried, and the
+            # subscription update arrives before the second query is sent
+            server.values[second] = 0.25
+            mixer.msg_handler(second, 0.25)
+        send_message(address, value)
+
+    server.send_message = send_with_update
+    auditor = ConsistencyAuditor(mixer, batch=2)
+    assert await auditor.audit_batch() == 2
+    assert mixer.state(mixer.address_keys(second)[0]) == 0.25
+    assert auditor.stats()["drifted"] == 0
+    assert auditor.stats()["audited"] == 2
+
+
+@pytest.mark.asyncio
+async def test_unexpected_error_stops_the_audit(fake_mixer, caplog):
+    mixer = _mixer(fake_mixer)
+
+    async def get(key, max_age=None):
+        raise RuntimeError("broken")
+
+    mixer.get = get
+    auditor = ConsistencyAuditor(mixer, budget=1000)
+    auditor.start()
+    task = auditor._task
+    with caplog.at_level(logging.ERROR, logger="behringermixer.audit"):
+        await asyncio.wait_for(task, 1)
+    assert task.exception() is None
+    assert auditor._task is None
+    assert "broken" in caplog.text
+
+
+def test_audit_pauses_while_reloading_or_disconnected(fake_mixer):
+    mixer = fake_mixer(heartbeat_interval=0.25)
+    auditor = ConsistencyAuditor(mixer)
+    assert not auditor._paused()
+    mixer._heartbeat.connected = False
+    assert mixer.connection_lost()
+    assert auditor._paused()
+    mixer._heartbeat.connected = True
+    mixer._reload_pending.append((set(), None))
+    assert mixer.reloading()
+    assert auditor._paused()
@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+from behringer_mixer import mixer_api
+from behringer_mixer.bridge import MixerBridge
+from behringer_mixer.osc_codec import OscEncoder, parse_datagram
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+class _Client(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.received = asyncio.Queue()
+
+    def datagram_received(self, data, client_address):
+        for message in parse_datagram(data):
+            self.received.put_nowait(message)
+
+
+async def _receive(client, count):
+    return dict(
+        [await asyncio.wait_for(client.received.get(), 1) for _ in range(count)]
+    )
+
+
+@pytest.mark.asyncio
+async def test_snapshot_deltas_and_writes():
+    mixer = mixer_api.create("XR12", ip="127.0.0.1")
+    mixer._update_state("/ch/01/mix/fader", [0.5])
+    written = []
+
+    async def set_value(key, value):
+        written.append((key, value))
+        mixer._update_state("/ch/02/mix/on", [value])
+
+    mixer.set_value = set_value
+    bridge = MixerBridge(mixer, port=0)
+    await bridge.start()
+    loop = asyncio.get_running_loop()
+    transport, client = await loop.create_datagram_endpoint(
+        _Client, local_addr=("127.0.0.1", 0)
+    )
+    encoder = OscEncoder()
+    try:
+        transport.sendto(
+            bytes(encoder.encode("/subscribe")), ("127.0.0.1", bridge.port)
+        )
+        assert await _receive(client, 2) == {
+            "/ch/1/mix_fader": [0.5],
+            "/ch/1/mix_fader_db": [-10.0],
+        }
+        mixer._update_state("/ch/01/mix/fader", [0.25])
+        bridge.updated({})
+        assert await _receive(client, 2) == {
+            "/ch/1/mix_fader": [0.25],
+            "/ch/1/mix_fader_db": [-30.0],
+        }
+        transport.sendto(
+            bytes(encoder.encode("/ch/2/mix_on", [True])), ("127.0.0.1", bridge.port)
+        )
+        assert await _receive(client, 1) == {"/ch/2/mix_on": [True]}
+        assert written == [("/ch/2/mix_on", True)]
+        transport.sendto(
+            bytes(encoder.encode("/unsubscribe")), ("127.0.0.1", bridge.port)
+        )
+        await asyncio.sleep(0.05)
+        assert not bridge.clients
+    finally:
+        transport.close()
+        bridge.stop()
+
+
+@pytest.mark.asyncio
+async def test_reset_and_deleted_keys():
+    mixer = mixer_api.create("XR12", ip="127.0.0.1")
+    mixer._update_state("/ch/01/mix/fader", [0.5])
+    bridge = MixerBridge(mixer, port=0)
+    await bridge.start()
+    loop = asyncio.get_running_loop()
+    transport, client = await loop.create_datagram_endpoint(
+        _Client, local_addr=("127.0.0.1", 0)
+    )
+    try:
+        transport.sendto(
+            bytes(OscEncoder().encode("/subscribe")), ("127.0.0.1", bridge.port)
+        )
+        await _receive(client, 2)
+        del mixer.state()["/ch/1/mix_fader_db"]
+        bridge.updated({})
+        assert await _receive(client, 1) == {"/deleted": ["/ch/1/mix_fader_db"]}
+        mixer.state().clear()
+        mixer._update_state("/ch/02/mix/on", [1])
+        bridge.updated({})
+        messages = [await asyncio.wait_for(client.received.get(), 1) for _ in range(2)]
+        assert messages == [("/reset", []), ("/ch/2/mix_on", [True])]
+    finally:
+        transport.close()
+        bridge.stop()
+
+
+def test_bundles_are_split():
+    mixer = mixer_api.create("X32", ip="127.0.0.1")
+    bridge = MixerBridge(mixer)
+    values = [(f"/ch/{number}/config_name", "x" * 100) for number in range(1, 200)]
+    datagrams = list(bridge._datagrams(values))
+    assert len(datagrams) > 1
+    assert all(len(datagram) <= 8192 for datagram in datagrams)
+    messages = [
+        message for datagram in datagrams for message in parse_datagram(datagram)
+    ]
+    assert len(messages) == 199
+
+
+def test_values_that_cannot_be_encoded_are_skipped():
+    mixer = mixer_api.create("X32", ip="127.0.0.1")
+    bridge = MixerBridge(mixer)
+    values = [("/big", 2**70), ("/other", object()), ("/ch/1/mix_on", True)]
+    (datagram,) = bridge._datagrams(values)
+    assert parse_datagram(datagram) == [("/ch/1/mix_on", [True])]
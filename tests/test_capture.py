@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+from behringer_mixer import mixer_api
+from behringer_mixer.capture import (
+    RECEIVED,
+    SENT,
+    CaptureWriter,
+    read_capture,
+    replay,
+)
+from behringer_mixer.mixer_osc import OSCClientServer
+from behringer_mixer.osc_codec import OscEncoder
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def _write_capture(path):
+    encoder = OscEncoder()
+    writer = CaptureWriter(str(path))
+    writer.record(SENT, encoder.encode("/ch/01/mix/fader"))
+    writer.record(RECEIVED, encoder.encode("/ch/01/mix/fader", [0.5]))
+    writer.record(RECEIVED, encoder.encode("/ch/02/mix/on", [1]))
+    writer.record(RECEIVED, encoder.encode("/unknown", [1]))
+    writer.close()
+    return writer
+
+
+def test_read_capture(tmp_path):
+    path = tmp_path / "show.cap"
+    assert _write_capture(path).count == 4
+    records = list(read_capture(str(path)))
+    assert [direction for _, direction, _ in records] == [
+        SENT,
+        RECEIVED,
+        RECEIVED,
+        RECEIVED,
+    ]
+    assert records[0][2] == b"/ch/01/mix/fader\0\0\0\0,\0\0\0"
+    timestamps = [timestamp for timestamp, _, _ in records]
+    assert timestamps == sorted(timestamps)
+    (tmp_path / "other").write_bytes(b"not a capture")
+    with pytest.raises(ValueError):
+        list(read_capture(str(tmp_path / "other")))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("direct_receive", [False, True])
+async def test_replay(tmp_path, direct_receive):
+    path = tmp_path / "show.cap"
+    _write_capture(path)
+    mixer = mixer_api.create("XR12", ip="127.0.0.1", direct_receive=direct_receive)
+    assert await replay(mixer, str(path)) == 3
+    assert mixer.state().to_dict() == {
+        "/ch/1/mix_fader": 0.5,
+        "/ch/1/mix_fader_db": -10.0,
+        "/ch/2/mix_on": True,
+    }
+    mixer = mixer_api.create("XR12", ip="127.0.0.1")
+    assert await replay(mixer, str(path), realtime=True, speed=10) == 3
+    assert mixer.state("/ch/2/mix_on") is True
+
+
+def test_records_are_flushed_while_capturing(tmp_path):
+    path = tmp_path / "show.cap"
+    encoder = OscEncoder()
+    writer = CaptureWriter(str(path), flush_interval=3600, flush_size=150)
+    writer.record(RECEIVED, encoder.encode("/ch/01/mix/fader", [0.5]))
+    assert list(read_capture(str(path))) == []
+    for _ in range(3):
+        writer.record(RECEIVED, encoder.encode("/ch/01/mix/fader", [0.5]))
+    assert len(list(read_capture(str(path)))) == 4
+    writer.flush_interval = 0
+    writer.record(SENT, encoder.encode("/ch/01/mix/fader"))
+    assert len(list(read_capture(str(path)))) == 5
+    writer.close()
+
+
+@pytest.mark.asyncio
+async def test_replay_is_not_captured_again(tmp_path):
+    path = tmp_path / "show.cap"
+    _write_capture(path)
+    mixer = mixer_api.create("XR12", ip="127.0.0.1")
+    mixer.server = OSCClientServer(
+        (mixer.ip, mixer.port), mixer.msg_handler, asyncio.get_running_loop()
+    )
+    recorder = CaptureWriter(str(tmp_path / "new.cap"))
+    mixer.server.recorder = recorder
+    assert await replay(mixer, str(path)) == 3
+    assert mixer.server.recorder is recorder
+    assert recorder.count == 0
+    recorder.close()
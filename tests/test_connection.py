@@ -0,0 +1,46 @@
+import time
+import pytest
+
+pytest_plugins = ("pytest_asyncio",)
+
+XINFO = ["192.168.1.10", "XR12-00-00-00", "XR12", "1.22"]
+
+
+def _mixer(fake_mixer, **kwargs):
+    mixer = fake_mixer(**kwargs)
+    mixer.server.values["/xinfo"] = XINFO
+    return mixer
+
+
+@pytest.mark.asyncio
+async def test_validate_connection_returns_on_first_reply(fake_mixer):
+    mixer = _mixer(fake_mixer, connect_retries=2)
+    mixer._CONNECT_TIMEOUT = 5
+    started = time.monotonic()
+    assert await mixer.validate_connection() is True
+    assert time.monotonic() - started < 1
+    assert mixer.server.sent == [("/xinfo", None)]
+    assert mixer.name() == "XR12-00-00-00"
+    assert 0 <= mixer.status()["connect_rtt"] < 1
+
+
+@pytest.mark.asyncio
+async def test_validate_connection_retries_after_timeout(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    mixer._CONNECT_TIMEOUT = 0.05
+    mixer.server.drop = 1
+    assert await mixer.validate_connection() is False
+    assert mixer.connect_rtt is None
+    mixer.server.drop = 1
+    assert await mixer.validate_connection(retries=1) is True
+    assert mixer.server.queries == 3
+    assert 0 <= mixer.connect_rtt < mixer._CONNECT_TIMEOUT
+
+
+@pytest.mark.asyncio
+async def test_validate_connection_gives_up(fake_mixer):
+    mixer = _mixer(fake_mixer, connect_retries=2)
+    mixer._CONNECT_TIMEOUT = 0.01
+    mixer.server.drop = 3
+    assert await mixer.validate_connection() is False
+    assert mixer.server.queries == 3
@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from behringer_mixer.errors import MixerError
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def _mixer(fake_mixer):
+    return fake_mixer(
+        fade_tick=0.01,
+        values={f"/ch/{number:02}/mix/fader": 0.0 for number in range(1, 4)},
+    )
+
+
+@pytest.mark.asyncio
+async def test_fades_share_ticks(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    results = await asyncio.gather(
+        mixer.fade("/ch/1/mix_fader", 0.75, 0.1, curve="fader"),
+        mixer.fade("/ch/2/mix_fader_db", -10, 0.1),
+    )
+    assert results == [True, True]
+    assert mixer.state("/ch/1/mix_fader") == 0.75
+    assert mixer.state("/ch/2/mix_fader_db") == -10.0
+    ramp = [
+        value
+        for address, value in mixer.server.sent
+        if address == "/ch/01/mix/fader" and value is not None
+    ]
+    assert 5 <= len(ramp) <= 12
+    assert ramp == sorted(ramp)
+    assert ramp[-1] == 0.75
+    assert mixer.server.sent[-1][1] is None
+    db_ramp = [
+        value
+        for address, value in mixer.server.sent
+        if address == "/ch/02/mix/fader" and value is not None
+    ]
+    # Half way through in dB (-50dB) is well below half way along the fader
+    assert db_ramp[len(db_ramp) // 2] < 0.2
+    assert db_ramp[-1] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_new_fade_replaces_running_one(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    first = asyncio.ensure_future(mixer.fade("/ch/3/mix_fader", 1.0, 10))
+    await asyncio.sleep(0.05)
+    assert await mixer.fade("/ch/3/mix_fader", 0.5, 0.02) is True
+    assert await first is False
+    assert mixer.state("/ch/3/mix_fader") == 0.5
+    assert not mixer._fade_engine._fades
+
+
+@pytest.mark.asyncio
+async def test_fade_rejects_other_keys(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    with pytest.raises(MixerError):
+        await mixer.fade("/ch/1/mix_on", 1, 1)
+    with pytest.raises(MixerError):
+        await mixer.fade("/ch/1/mix_fader", 1, 1, curve="log")
+
+
+@pytest.mark.asyncio
+async def test_fade_needs_the_current_value(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    reads = []
+
+    async def get(key, max_age=None):
+        # The mixer has not sent a value for the key
+        reads.append(max_age)
+
+    mixer.get = get
+    with pytest.raises(MixerError):
+        await mixer.fade("/ch/1/mix_fader", 1, 0.1)
+    assert reads == [None, 0]
+    assert not mixer._fade_engine._fades
+
+
+@pytest.mark.asyncio
+async def test_headamp_fade_uses_the_gain_scale(fake_mixer):
+    # Headamp gain is linear from -12dB to +60dB, not on the fader law
+    mixer = fake_mixer("X32", fade_tick=0.01, values={"/headamp/001/gain": 0.5})
+    assert mixer.state("/headamp/2/gain_db") == 24.0
+    assert await mixer.fade("/headamp/2/gain_db", 30, 0.05) is True
+    assert mixer.state("/headamp/2/gain_db") == pytest.approx(30.0)
+    ramp = [
+        value
+        for address, value in mixer.server.sent
+        if address == "/headamp/001/gain" and value is not None
+    ]
+    assert ramp == sorted(ramp)
+    assert ramp[-1] == pytest.approx(42 / 72)
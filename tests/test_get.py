@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def _mixer(fake_mixer):
+    return fake_mixer(values={"/ch/01/mix/fader": 0.5})
+
+
+@pytest.mark.asyncio
+async def test_fresh_value_is_not_queried(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    assert await mixer.get("/ch/1/mix_fader", max_age=0) == 0.5
+    assert mixer.server.queries == 1
+    mixer.server.values["/ch/01/mix/fader"] = 0.75
+    assert await mixer.get("/ch/1/mix_fader", max_age=10) == 0.5
+    assert await mixer.get("/ch/1/mix_fader_db") == -10.0
+    assert mixer.server.queries == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_value_is_queried_again(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    await mixer.get("/ch/1/mix_fader", max_age=0)
+    mixer.server.values["/ch/01/mix/fader"] = 0.75
+    await asyncio.sleep(0.05)
+    assert await mixer.get("/ch/1/mix_fader", max_age=0.01) == 0.75
+    assert mixer.server.queries == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_gets_share_one_query(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    values = await asyncio.gather(
+        mixer.get("/ch/1/mix_fader", max_age=0),
+        mixer.get("/ch/1/mix_fader", max_age=0),
+        mixer.get("/ch/1/mix_fader_db", max_age=0),
+    )
+    assert values == [0.5, 0.5, -10.0]
+    assert mixer.server.queries == 1
@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+from behringer_mixer.heartbeat import HeartbeatMonitor
+
+pytest_plugins = ("pytest_asyncio",)
+
+XINFO = ["192.168.1.10", "XR12-00-00-00", "XR12", "1.22"]
+
+
+def test_timeout_follows_rtt():
+    heartbeat = HeartbeatMonitor(min_timeout=0.01, max_timeout=1.0)
+    assert heartbeat.timeout() == 1.0
+    for _ in range(20):
+        heartbeat.record_reply(0.02)
+    assert 0.02 <= heartbeat.timeout() < 0.03
+    heartbeat.record_reply(0.2)
+    assert heartbeat.jitter > 0.04
+
+
+def test_loss_after_consecutive_misses():
+    heartbeat = HeartbeatMonitor(misses=3)
+    assert heartbeat.record_miss() is False
+    assert heartbeat.record_miss() is False
+    heartbeat.record_reply(0.01)
+    assert heartbeat.record_miss() is False
+    assert heartbeat.record_miss() is False
+    assert heartbeat.record_miss() is True
+    assert heartbeat.connected is False
+    assert heartbeat.record_miss() is False
+    assert heartbeat.record_reply(0.01) is True
+    assert heartbeat.connected is True
+
+
+async def _wait_for(condition, timeout=2):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("timed out")
+
+
+def test_heartbeats_are_opt_in(fake_mixer):
+    assert fake_mixer()._heartbeat is None
+    assert fake_mixer(heartbeat_interval=0.25)._heartbeat.interval == 0.25
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_worker_detects_outage(fake_mixer):
+    mixer = fake_mixer(lazy=True, heartbeat_interval=0.01, heartbeat_misses=2)
+    mixer.server.values["/xinfo"] = XINFO
+    statuses = []
+    mixer._subscription_status_callback = statuses.append
+    mixer._callback_function = [].append
+    worker = asyncio.ensure_future(mixer._heartbeat_worker())
+    await _wait_for(lambda: mixer.server.queries >= 3)
+    assert mixer._heartbeat.rtt is not None
+    assert mixer.subscription_connected()
+    mixer.server.drop = 1000
+    await _wait_for(lambda: statuses == [False])
+    assert not mixer.subscription_connected()
+    mixer.server.drop = 0
+    await _wait_for(lambda: statuses == [False, True])
+    assert mixer.subscription_connected()
+    assert (mixer.subscription_string, None) in mixer.server.sent
+    mixer._callback_function = None
+    await worker
+
+
+@pytest.mark.asyncio
+async def test_subscribing_again_keeps_one_heartbeat(fake_mixer):
+    mixer = fake_mixer(heartbeat_interval=0.01)
+    mixer.server.values["/xinfo"] = XINFO
+    subscriptions = [
+        asyncio.ensure_future(mixer.subscribe([].append)) for _ in range(2)
+    ]
+    await _wait_for(lambda: mixer.server.queries >= 2)
+    workers = [
+        task for task in mixer.tasks if task.get_coro().__name__ == "_heartbeat_worker"
+    ]
+    assert workers == [mixer._heartbeat_task]
+    mixer._callback_function = None
+    await mixer._heartbeat_task
+    for task in subscriptions:
+        task.cancel()
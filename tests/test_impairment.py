@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from behringer_mixer.impairment import NetworkImpairment
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+async def _run(impairment, count=200, wait=0.05):
+    delivered = []
+    for number in range(count):
+        impairment.send.apply(number, delivered.append)
+    await asyncio.sleep(wait)
+    return delivered
+
+
+@pytest.mark.asyncio
+async def test_seeded_loss_and_duplication():
+    settings = {"loss": 0.2, "duplicate": 0.1}
+    first = await _run(NetworkImpairment(seed=7, **settings))
+    second = await _run(NetworkImpairment(seed=7, **settings))
+    other = await _run(NetworkImpairment(seed=8, **settings))
+    assert first == second
+    assert first != other
+    assert 120 < len(set(first)) < 190
+    assert len(first) > len(set(first))
+
+
+@pytest.mark.asyncio
+async def test_delay_and_reorder():
+    impairment = NetworkImpairment(receive={"delay": 0.01, "reorder": 0.2})
+    assert await _run(impairment) == list(range(200))
+    delivered = []
+    for number in range(200):
+        impairment.receive.apply(number, delivered.append)
+    assert delivered == []
+    await asyncio.sleep(0.1)
+    assert sorted(delivered) == list(range(200))
+    assert delivered != list(range(200))
+    assert impairment.status()["receive"]["reordered"] > 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limit():
+    impairment = NetworkImpairment(rate=1000, queue_limit=20)
+    delivered = []
+    for number in range(50):
+        impairment.send.apply(number, delivered.append)
+    assert delivered == [0]
+    dropped = impairment.status()["send"]["queue_dropped"]
+    assert 25 <= dropped <= 30
+    await asyncio.sleep(0.05)
+    assert len(delivered) == 50 - dropped
+    assert delivered == sorted(delivered)
@@ -0,0 +1,39 @@
+import pytest
+from behringer_mixer import mixer_api
+from behringer_mixer.monitor import TrafficMonitor
+
+
+def test_sample_and_render():
+    mixer = mixer_api.create("XR12", ip="127.0.0.1")
+    monitor = TrafficMonitor(mixer)
+    assert mixer.tracer is monitor.tracer
+    mixer._callback_function = lambda data: None
+    for number in range(30):
+        mixer.tracer.received(32)
+        mixer.msg_handler("/ch/01/mix/fader", number / 100)
+    for number in range(10):
+        mixer.tracer.received(32)
+        mixer.msg_handler("/bus/1/mix/on", number % 2)
+    stats = monitor.sample()
+    rates = stats["address_rates"]
+    assert stats["message_rate"] * stats["elapsed"] == pytest.approx(40)
+    assert rates["/ch/01/mix/fader"] == pytest.approx(3 * rates["/bus/1/mix/on"])
+    assert set(stats["tag_rates"]) == {"channels", "busses"}
+    assert stats["decode_latency"]["max"] >= stats["decode_latency"]["mean"] > 0
+    assert stats["callback_latency"] is not None
+    screen = monitor.render(stats)
+    assert "/ch/01/mix/fader" in screen.splitlines()[6]
+    assert monitor.sample()["address_rates"] == {}
+
+
+def test_sent_and_received_rates_of_mixed_traffic():
+    mixer = mixer_api.create("XR12", ip="127.0.0.1")
+    monitor = TrafficMonitor(mixer)
+    for number in range(100):
+        mixer.tracer.sent("/ch/01/mix/fader", 32)
+        mixer.tracer.received(32)
+        mixer.msg_handler("/ch/01/mix/fader", number / 100)
+    stats = monitor.sample()
+    assert stats["sent_rate"] * stats["elapsed"] == pytest.approx(100)
+    assert stats["received_rate"] * stats["elapsed"] == pytest.approx(100)
+    assert stats["message_rate"] * stats["elapsed"] == pytest.approx(100)
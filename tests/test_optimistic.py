@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def _mixer(fake_mixer, **kwargs):
+    mixer = fake_mixer(optimistic_writes=True, **kwargs)
+    events = []
+    mixer._callback_function = events.append
+    return mixer, events
+
+
+@pytest.mark.asyncio
+async def test_optimistic_write_confirmed_by_read_back(fake_mixer):
+    mixer, events = _mixer(fake_mixer, reconcile_delay=0.01)
+    await mixer.set_value("/ch/1/mix_fader", 0.5)
+    # Rounded to the nearest of the 1024 fader positions
+    fader = mixer.state("/ch/1/mix_fader")
+    assert fader == pytest.approx(512 / 1023)
+    assert events == [
+        {"property": "/ch/1/mix_fader", "value": fader},
+        {"property": "/ch/1/mix_fader_db", "value": -10.0},
+    ]
+    assert mixer.server.sent == [("/ch/01/mix/fader", 512 / 1023)]
+    await asyncio.sleep(0.05)
+    assert mixer.server.sent[-1] == ("/ch/01/mix/fader", None)
+    assert len(events) == 2
+    assert not mixer._optimistic
+
+
+@pytest.mark.asyncio
+async def test_optimistic_write_corrected(fake_mixer):
+    mixer, events = _mixer(fake_mixer, reconcile_delay=0.01)
+    mixer.server.values["/ch/01/mix/fader"] = 0.25
+    mixer.server.rejected.add("/ch/01/mix/fader")
+    await mixer.set_value("/ch/1/mix_fader_db", -10)
+    assert mixer.state("/ch/1/mix_fader") == pytest.approx(512 / 1023)
+    await asyncio.sleep(0.05)
+    assert mixer.state("/ch/1/mix_fader") == 0.25
+    assert events[-2:] == [
+        {"property": "/ch/1/mix_fader", "value": 0.25, "correction": True},
+        {"property": "/ch/1/mix_fader_db", "value": -30.0, "correction": True},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fader_write_between_steps_is_not_corrected(fake_mixer):
+    mixer, events = _mixer(fake_mixer, reconcile_delay=0.01)
+    server = mixer.server
+
+    def store(value):
+        # The mixer keeps the nearest of its fader positions
+        server.values["/ch/01/mix/fader"] = round(value * 1023) / 1023
+
+    server.actions["/ch/01/mix/fader"] = store
+    await mixer.set_value("/ch/1/mix_fader", 0.3)
+    await asyncio.sleep(0.05)
+    assert server.sent[-1] == ("/ch/01/mix/fader", None)
+    assert not mixer._optimistic
+    assert len(events) == 2
+    assert not any(event.get("correction") for event in events)
+    assert mixer.state("/ch/1/mix_fader") == pytest.approx(307 / 1023)
+
+
+@pytest.mark.asyncio
+async def test_send_level_write_uses_send_steps(fake_mixer):
+    mixer, events = _mixer(fake_mixer, reconcile_delay=0.01)
+    server = mixer.server
+
+    def store(value):
+        # Send levels have 161 positions
+        server.values["/ch/01/mix/01/level"] = round(value * 160) / 160
+
+    server.actions["/ch/01/mix/01/level"] = store
+    await mixer.set_value("/chsend/1/1/mix_fader", 0.31)
+    assert mixer.state("/chsend/1/1/mix_fader") == 0.3125
+    await asyncio.sleep(0.05)
+    assert server.sent[-1] == ("/ch/01/mix/01/level", None)
+    assert not mixer._optimistic
+    assert not any(event.get("correction") for event in events)
+    assert mixer.state("/chsend/1/1/mix_fader") == 0.3125
+
+
+@pytest.mark.asyncio
+async def test_echoes_of_earlier_writes_are_ignored(fake_mixer):
+    mixer, events = _mixer(fake_mixer, reconcile_delay=10)
+    await mixer.set_value("/ch/2/mix_on", True)
+    await mixer.set_value("/ch/2/mix_on", False)
+    await mixer.set_value("/ch/2/mix_on", True)
+    assert len(events) == 3
+    mixer.msg_handler("/ch/02/mix/on", 1)
+    mixer.msg_handler("/ch/02/mix/on", 0)
+    assert mixer.state("/ch/2/mix_on") is True
+    assert len(events) == 3
+    mixer.msg_handler("/ch/02/mix/on", 1)
+    assert not mixer._optimistic
+    mixer.msg_handler("/ch/02/mix/on", 0)
+    assert mixer.state("/ch/2/mix_on") is False
+    assert events[-1] == {"property": "/ch/2/mix_on", "value": False}
+
+
+@pytest.mark.asyncio
+async def test_non_optimistic_write(fake_mixer):
+    mixer, events = _mixer(fake_mixer)
+    mixer.server.drop = 1
+    await mixer.set_value("/ch/1/mix_on", True, optimistic=False)
+    assert mixer.server.sent == [("/ch/01/mix/on", 1), ("/ch/01/mix/on", None)]
+    assert mixer.state("/ch/1/mix_on") is None
+    assert events == []
@@ -0,0 +1,86 @@
+import pytest
+from pythonosc.osc_message_builder import OscMessageBuilder
+from behringer_mixer.mixer_osc import OSCClientServer
+from behringer_mixer.osc_codec import OscEncoder, float32, parse_datagram
+
+
+def build_reference(address, vals):
+    builder = OscMessageBuilder(address=address)
+    for val in vals:
+        builder.add_arg(val)
+    return builder.build().dgram
+
+
+@pytest.mark.parametrize(
+    "address, vals",
+    [
+        ("/ch/01/mix/fader", []),
+        ("/xinfo", []),
+        ("/ch/01/mix/fader", [0.75]),
+        ("/ch/01/mix/on", [1]),
+        ("/-action/goscene", ["12"]),
+        ("/$ctl/lib/$action", ["GO"]),
+        ("/ch/1/fdr", ["-3.5"]),
+        ("/abc", [1, 0.5, "xyz", True, False]),
+        ("/blob", [b"\x01\x02\x03"]),
+        ("/big", [2**40]),
+    ],
+)
+def test_encode_matches_pythonosc(address, vals):
+    encoder = OscEncoder()
+    assert bytes(encoder.encode(address, vals)) == build_reference(address, vals)
+
+
+def test_encode_scalar_and_none():
+    encoder = OscEncoder()
+    assert bytes(encoder.encode("/ch/01/mix/on", 0)) == build_reference(
+        "/ch/01/mix/on", [0]
+    )
+    assert encoder.encode("/xremote", None) == build_reference("/xremote", [])
+
+
+def test_float32_matches_the_decoded_value():
+    (message,) = parse_datagram(bytes(OscEncoder().encode("/a", 0.3)))
+    assert float32(0.3) == message[1][0] != 0.3
+
+
+def test_query_is_cached():
+    encoder = OscEncoder()
+    encoder.prime(["/ch/01/mix/fader"])
+    assert encoder.query("/ch/01/mix/fader") is encoder.encode("/ch/01/mix/fader")
+
+
+@pytest.mark.parametrize(
+    "address, vals",
+    [
+        ("/xinfo", []),
+        ("/ch/01/mix/fader", [0.75]),
+        ("/xinfo", ["192.168.1.1", "X32", "X32", "4.06"]),
+        ("/abc", [1, 0.5, "xyz", True, False, 2**40]),
+    ],
+)
+def test_parse_datagram(address, vals):
+    assert parse_datagram(build_reference(address, vals)) == [(address, vals)]
+
+
+def test_parse_blob_is_not_copied():
+    datagram = build_reference("/meters/1", [b"\x01\x02\x03\x04\x05"])
+    ((address, (blob,)),) = parse_datagram(datagram)
+    assert isinstance(blob, memoryview)
+    assert blob.obj is datagram
+    assert bytes(blob) == b"\x01\x02\x03\x04\x05"
+
+
+def test_direct_receive_filters_addresses():
+    received = []
+    server = OSCClientServer(
+        ("127.0.0.1", 10023),
+        lambda addr, *data: received.append((addr, data)),
+        None,
+        address_filter={"/ch/01/mix/on"},
+        direct_receive=True,
+    )
+    server.datagram_received(build_reference("/ch/01/mix/on", [1]), None)
+    server.datagram_received(build_reference("/ch/02/mix/on", [1]), None)
+    server.datagram_received(b"/ch/01/mix/on\x00\x00\x00,f\x00\x00", None)
+    assert received == [("/ch/01/mix/on", (1,))]
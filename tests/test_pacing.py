@@ -0,0 +1,40 @@
+import time
+import pytest
+from behringer_mixer.pacing import PacingController
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.mark.asyncio
+async def test_pace_limits_rate():
+    pacer = PacingController(rate=200, adaptive=False)
+    start = time.monotonic()
+    for _ in range(20):
+        await pacer.pace()
+    assert time.monotonic() - start >= 19 / 200
+
+
+def test_reply_increases_rate():
+    pacer = PacingController(rate=100, increase=5)
+    pacer.expect("/ch/01/mix/fader")
+    pacer.reply("/ch/01/mix/fader")
+    assert pacer.rate == 105
+    pacer.reply("/ch/01/mix/fader")
+    assert pacer.rate == 105
+
+
+@pytest.mark.asyncio
+async def test_lost_reply_decreases_rate():
+    pacer = PacingController(rate=400, min_rate=50, reply_timeout=0.01)
+    pacer.expect("/ch/01/mix/fader")
+    time.sleep(0.02)
+    await pacer.pace()
+    assert pacer.rate == 200
+    assert pacer.status()["lost_replies"] == 1
+
+
+@pytest.mark.asyncio
+async def test_disabled_pacing():
+    pacer = PacingController(rate=None)
+    await pacer.pace()
+    assert pacer.status()["send_rate"] is None
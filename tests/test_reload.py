@@ -0,0 +1,102 @@
+import time
+import pytest
+from behringer_mixer import mixer_api
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def test_reload_tiers_default_priority():
+    mixer = mixer_api.create("XR12", ip="192.168.1.1")
+    tiers = mixer._reload_tiers()
+    assert sum(len(tier) for tier in tiers) == len(mixer._mappings)
+    assert "/ch/01/mix/fader" in tiers[0]
+    assert "/ch/01/mix/on" in tiers[0]
+    assert "/ch/01/config/name" not in tiers[0]
+    assert "/ch/01/mix/01/level" in tiers[1]
+    assert "/ch/01/config/name" in tiers[2]
+    assert "/-snap/index" in tiers[-1]
+
+
+def test_reload_tiers_selection():
+    mixer = mixer_api.create("X32", ip="192.168.1.1")
+    assert mixer._reload_tiers(tags=["usb"]) == [
+        ["/-stat/tape/state", "/-stat/tape/file", "/-stat/usbmounted"]
+    ]
+    tiers = mixer._reload_tiers(prefix="/chsend/5/")
+    assert len(tiers) == 1
+    assert len(tiers[0]) == 2 * mixer.num_bus
+    tiers = mixer._reload_tiers(prefix=["/ch/1/", "/usb/"], priority=[["usb"]])
+    assert tiers[0] == ["/-stat/tape/state", "/-stat/tape/file", "/-stat/usbmounted"]
+    assert sorted(tiers[1]) == [
+        "/ch/01/config/color",
+        "/ch/01/config/name",
+        "/ch/01/mix/fader",
+        "/ch/01/mix/on",
+    ]
+
+
+def test_lazy_groups():
+    mixer = mixer_api.create("X32", ip="192.168.1.1", lazy=True)
+    assert mixer._group("/chsend/5/3/mix_fader") == "/chsend/5/"
+    assert mixer._group("/main/st/mix_on") == "/main/st/"
+    assert mixer._group("/scene/current") == "/scene/"
+    assert "/ch/32/" in mixer._groups
+    assert mixer._reload_tiers(prefix=["/ch/3/"])[0][0] == "/ch/03/mix/fader"
+
+
+@pytest.mark.asyncio
+async def test_lazy_group_without_replies_is_fetched_again(fake_mixer):
+    mixer = fake_mixer(lazy=True)
+    mixer.server.default = 0
+    mixer.server.drop = 1000
+    await mixer.fetch("/ch/1/")
+    assert "/ch/1/" not in mixer._loaded_groups
+    mixer.server.drop = 0
+    await mixer.fetch("/ch/1/mix_fader")
+    assert "/ch/1/" in mixer._loaded_groups
+    assert mixer.state("/ch/1/mix_fader") == 0
+
+
+@pytest.mark.asyncio
+async def test_dropped_replies_are_retried_with_backoff(fake_mixer):
+    mixer = fake_mixer()
+    server = mixer.server
+    server.values = {"/ch/01/mix/fader": 0.5, "/ch/02/mix/fader": 0.25}
+    # Both first queries and the first retry are lost
+    server.drop = 3
+    sent_at = []
+    send_message = server.send_message
+
+    def timed_send(address, value):
+        sent_at.append(time.monotonic())
+        send_message(address, value)
+
+    server.send_message = timed_send
+    report = await mixer._load_addresses(list(server.values), retries=3)
+    assert report == {"requested": 2, "received": 2, "retries": 2, "missing": []}
+    assert server.queries == 5
+    assert mixer.state("/ch/1/mix_fader") == 0.5
+    assert mixer.state("/ch/2/mix_fader") == 0.25
+    # The wait before the second retry is twice as long as before the first
+    first_wait = sent_at[2] - sent_at[1]
+    second_wait = sent_at[4] - sent_at[3]
+    assert second_wait > 1.5 * first_wait
+
+
+@pytest.mark.asyncio
+async def test_addresses_without_replies_are_reported_missing(fake_mixer):
+    mixer = fake_mixer()
+    mixer.server.values = {"/ch/01/mix/fader": 0.5}
+    addresses = ["/ch/01/mix/fader", "/ch/02/mix/fader"]
+    report = await mixer._load_addresses(addresses, retries=2)
+    assert report == {
+        "requested": 2,
+        "received": 1,
+        "retries": 2,
+        "missing": ["/ch/02/mix/fader"],
+    }
+    assert mixer.server.queries == 4
+    assert mixer.state("/ch/1/mix_fader") == 0.5
+    assert mixer.state("/ch/2/mix_fader") is None
+    assert mixer.state("/ch/2/mix_fader_db") is None
+    assert not mixer._reload_pending
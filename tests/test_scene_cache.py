@@ -0,0 +1,85 @@
+import pytest
+
+pytest_plugins = ("pytest_asyncio",)
+
+SCENES = {
+    "1": {"/ch/01/mix/fader": 0.25, "/ch/01/mix/on": 1, "/ch/02/mix/fader": 0.5},
+    "2": {"/ch/01/mix/fader": 0.75, "/ch/01/mix/on": 0, "/ch/02/mix/fader": 0.5},
+}
+
+
+def _mixer(fake_mixer, size=2):
+    mixer = fake_mixer(lazy=True, scene_cache_size=size)
+    mixer._SCENE_SETTLE = 0
+    mixer._loaded_groups.update(["/ch/1/", "/ch/2/"])
+    mixer.server.default = 0
+    mixer.server.actions["/-snap/load"] = lambda scene: mixer.server.values.update(
+        SCENES[scene]
+    )
+    return mixer
+
+
+@pytest.mark.asyncio
+async def test_cached_scene_is_applied_at_once(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    mixer._loaded_groups.update(["/usb/", "/scene/"])
+    assert (await mixer.load_scene(1))["cached"] is False
+    assert (await mixer.load_scene(2))["cached"] is False
+    assert mixer.state("/ch/1/mix_fader") == 0.75
+    updates = []
+    mixer._callback_function = updates.append
+    queries = mixer.server.queries
+    report = await mixer.load_scene(1)
+    assert report["cached"] is True
+    # Read before the mixer has replied to anything
+    assert mixer.state("/ch/1/mix_fader") == 0.25
+    assert mixer.state("/ch/1/mix_on") is True
+    assert sorted(update["property"] for update in updates) == [
+        "/ch/1/mix_fader",
+        "/ch/1/mix_fader_db",
+        "/ch/1/mix_on",
+    ]
+    await mixer._scene_validation
+    assert mixer.server.queries > queries
+    # The re-read matched the cache, so nothing more was notified
+    assert len(updates) == 3
+    assert "/ch/1/mix_on" in mixer._scene_cache["1"]
+    # Status is read from the mixer but is not part of a scene
+    assert mixer.state("/usb/state") == "STOP"
+    for key in ("/status", "/usb/state", "/scene/current", "/show/name"):
+        assert key not in mixer._scene_cache["1"]
+
+
+@pytest.mark.asyncio
+async def test_validation_corrects_cached_scene(fake_mixer):
+    mixer = _mixer(fake_mixer)
+    await mixer.load_scene(1)
+    await mixer.load_scene(2)
+    # The scene was changed on the console since it was cached
+    SCENES["1"]["/ch/02/mix/fader"] = 0.125
+    updates = []
+    mixer._callback_function = updates.append
+    try:
+        await mixer.load_scene(1)
+        assert mixer.state("/ch/2/mix_fader") == 0.5
+        applied = len(updates)
+        await mixer._scene_validation
+        assert mixer.state("/ch/2/mix_fader") == 0.125
+        # Only the value that differs from the cache is notified
+        assert sorted(update["property"] for update in updates[applied:]) == [
+            "/ch/2/mix_fader",
+            "/ch/2/mix_fader_db",
+        ]
+        assert mixer._scene_cache["1"]["/ch/2/mix_fader"] == 0.125
+    finally:
+        SCENES["1"]["/ch/02/mix/fader"] = 0.5
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used(fake_mixer):
+    mixer = _mixer(fake_mixer, size=1)
+    await mixer.load_scene(1)
+    await mixer.load_scene(2)
+    assert list(mixer._scene_cache) == ["2"]
+    assert (await mixer.load_scene(1))["cached"] is False
+    assert not _mixer(fake_mixer, size=0)._scene_cache
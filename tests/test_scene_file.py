@@ -0,0 +1,85 @@
+import io
+import pytest
+from behringer_mixer import mixer_api
+from behringer_mixer.errors import MixerError
+from behringer_mixer.scene_file import iter_messages, read_scene_file
+
+X32_SCENE = """#4.0# "Sunday" "" %000000000 1
+/config/chlink OFF OFF OFF OFF OFF OFF OFF OFF OFF OFF OFF OFF OFF OFF OFF OFF
+/config/mute OFF ON OFF OFF OFF OFF
+/ch/01/config "Kick In" 1 RD 1
+/ch/01/mix ON  -10.0 OFF +0 OFF   -oo
+/ch/01/mix/01 OFF  +0.0 +0 EQ-> 0
+/ch/01/mix/02 ON   -oo
+/ch/02/config "12" 1 YEi 2
+/ch/02/mix OFF   -oo OFF +0 OFF   -oo
+/ch/02/mix/03 ON  -23.7 +0 EQ-> 0
+/main/st/config "LR" 1 WH
+/main/st/mix ON  +10.0 +0
+/dca/1 ON -5.0
+/dca/1/config "Band" 1 BL
+/headamp/000 +24.0 ON
+"""
+
+
+def _mixer(mixer_type="X32"):
+    return mixer_api.create(mixer_type, ip="127.0.0.1")
+
+
+def test_read_x32_scene():
+    mixer = _mixer()
+    state = read_scene_file(mixer, io.StringIO(X32_SCENE))
+    assert state["/ch/1/config_name"] == "Kick In"
+    assert state["/ch/1/config_color"] == 1
+    assert state["/ch/1/config_color_name"] == "RD"
+    assert state["/ch/1/mix_on"] is True
+    assert state["/ch/1/mix_fader_db"] == -10.0
+    assert state["/ch/1/mix_fader"] == pytest.approx(0.5, abs=0.001)
+    assert state["/chsend/1/1/mix_on"] is False
+    assert state["/chsend/1/1/mix_fader_db"] == 0.0
+    assert state["/chsend/1/2/mix_fader"] == 0.0
+    assert state["/ch/2/config_name"] == "12"
+    assert state["/ch/2/config_color_name"] == "YEi"
+    assert state["/ch/2/mix_on"] is False
+    # Send levels have 161 positions
+    assert state["/chsend/2/3/mix_fader"] == pytest.approx(53 / 160)
+    assert state["/main/st/mix_fader"] == 1.0
+    assert state["/dca/1/mix_fader_db"] == -5.0
+    assert state["/dca/1/config_name"] == "Band"
+    assert state["/mutegroups/1/on"] is False
+    assert state["/mutegroups/2/on"] is True
+    assert state["/headamp/1/gain_db"] == 24.0
+    assert state["/headamp/1/phantom"] is True
+
+
+def test_faders_are_quantized_like_the_mixer():
+    mixer = _mixer()
+    messages = dict(iter_messages(mixer, ["/ch/03/mix ON -23.7 OFF +0 OFF -oo\n"]))
+    fader = messages["/ch/03/mix/fader"]
+    assert round(fader * 1023) == pytest.approx(fader * 1023, abs=1e-4)
+    assert messages["/ch/03/mix/on"] == 1
+
+
+def test_read_xair_snapshot(tmp_path):
+    path = tmp_path / "snapshot.snp"
+    path.write_text(
+        '#2.1# "Rehearsal"\n'
+        '/ch/01/config "Vox" 1 GN 1\n'
+        "/ch/01/mix ON -3.0 ON +0 OFF -oo\n"
+        "/ch/01/mix/01 -6.0 +0 PRE\n"
+        "/ch/01/mix/01/grpon ON\n"
+        "/lr/mix ON -oo +0\n"
+    )
+    mixer = _mixer("XR18")
+    state = read_scene_file(mixer, path)
+    assert state["/ch/1/config_name"] == "Vox"
+    assert state["/ch/1/mix_fader_db"] == -3.0
+    assert state["/chsend/1/1/mix_fader_db"] == -6.0
+    assert state["/chsend/1/1/mix_on"] is True
+    assert state["/main/st/mix_on"] is True
+    assert state["/main/st/mix_fader"] == 0.0
+
+
+def test_wing_is_not_supported():
+    with pytest.raises(MixerError):
+        read_scene_file(_mixer("WING"), io.StringIO(X32_SCENE))
@@ -0,0 +1,95 @@
+import asyncio
+import multiprocessing
+import pytest
+import struct
+from behringer_mixer import mixer_api
+from behringer_mixer.errors import MixerError
+from behringer_mixer.shared_state import SharedStateReader, SharedStateWriter
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def _read_in_child(name, queue):
+    reader = SharedStateReader(name)
+    queue.put(reader.read())
+    reader.close()
+
+
+def test_reader_sees_published_state():
+    mixer = mixer_api.create("XR12", ip="192.168.1.1")
+    writer = SharedStateWriter(mixer.state())
+    try:
+        mixer._update_state("/ch/01/mix/fader", [0.5])
+        mixer._update_state("/ch/02/mix/on", [1])
+        mixer._update_state("/ch/01/config/name", ["VOX"])
+        reader = SharedStateReader(writer.name)
+        assert reader.read() == {}
+        assert writer.publish()
+        assert not writer.publish()
+        assert reader.seq == mixer.state().seq
+        assert reader.read() == {
+            "/ch/1/mix_fader": 0.5,
+            "/ch/1/mix_fader_db": -10.0,
+            "/ch/2/mix_on": True,
+        }
+        assert reader.family("/ch/{}/mix_on")[:3] == [None, True, None]
+        mixer.state().clear()
+        writer.publish()
+        assert reader.read() == {}
+        reader.close()
+    finally:
+        writer.close()
+
+
+def test_reader_gives_up_on_stalled_writer():
+    mixer = mixer_api.create("XR12", ip="192.168.1.1")
+    writer = SharedStateWriter(mixer.state())
+    try:
+        mixer._update_state("/ch/01/mix/fader", [0.5])
+        writer.publish()
+        reader = SharedStateReader(writer.name)
+        # The writer stopped half way through a publish
+        struct.pack_into("<Q", writer.shm.buf, 8, 3)
+        with pytest.raises(MixerError):
+            reader.read()
+        struct.pack_into("<Q", writer.shm.buf, 8, 4)
+        assert reader.read()["/ch/1/mix_fader"] == 0.5
+        reader.close()
+    finally:
+        writer.close()
+
+
+def test_reader_in_other_process():
+    mixer = mixer_api.create("XR12", ip="192.168.1.1")
+    writer = SharedStateWriter(mixer.state())
+    try:
+        mixer._update_state("/ch/03/mix/fader", [0.75])
+        writer.publish()
+        queue = multiprocessing.get_context("spawn").Queue()
+        process = multiprocessing.get_context("spawn").Process(
+            target=_read_in_child, args=(writer.name, queue)
+        )
+        process.start()
+        state = queue.get(timeout=30)
+        process.join(30)
+        assert state["/ch/3/mix_fader"] == 0.75
+    finally:
+        writer.close()
+
+
+@pytest.mark.asyncio
+async def test_export_shared_state():
+    mixer = mixer_api.create("XR12", ip="192.168.1.1")
+    mixer.server = type(
+        "Server", (), {"shutdown": lambda self: None, "recorder": None}
+    )()
+    name = mixer.export_shared_state(interval=0.01)
+    assert mixer.export_shared_state() == name
+    mixer._update_state("/ch/01/mix/on", [0])
+    reader = SharedStateReader(name)
+    await asyncio.sleep(0.05)
+    assert reader.read() == {"/ch/1/mix_on": False}
+    reader.close()
+    await mixer.stop()
+    with pytest.raises(FileNotFoundError):
+        SharedStateReader(name)
@@ -0,0 +1,185 @@
+import gc
+import struct
+import tracemalloc
+from behringer_mixer import mixer_api
+from behringer_mixer.state_store import StateStore, family_name
+
+
+def float32(value):
+    return struct.unpack(">f", struct.pack(">f", value))[0]
+
+
+def test_family_name():
+    assert family_name("/chsend/5/3/mix_fader") == ("/chsend/{}/{}/mix_fader", (5, 3))
+    assert family_name("/main/st/mix_on") == ("/main/st/mix_on", ())
+
+
+def test_state_matches_dict_updates():
+    mixer = mixer_api.create("X32", ip="192.168.1.1")
+    expected = {}
+    messages = [
+        ("/ch/01/mix/fader", [float32(0.37829911708831787)]),
+        ("/ch/02/mix/fader", [1.0]),
+        ("/ch/03/mix/fader", [0.0]),
+        ("/ch/01/mix/on", [1]),
+        ("/ch/01/config/name", ["VOX 1"]),
+        ("/ch/01/config/color", [4]),
+        ("/ch/01/mix/03/level", [float32(0.75)]),
+        ("/headamp/000/gain", [float32(0.5)]),
+        ("/-stat/tape/state", [2]),
+    ]
+    for address, values in messages:
+        for update in mixer._update_state(address, values):
+            expected[update["property"]] = update["value"]
+    state = mixer.state()
+    assert isinstance(state, StateStore)
+    assert state == expected
+    assert len(state) == len(expected)
+    assert type(state["/ch/2/mix_fader_db"]) is int
+    assert state["/ch/1/mix_fader_db"] == -19.7
+    assert state["/ch/1/mix_on"] is True
+    assert "/ch/1/mix_fader" in state._slots
+    assert state._slots["/ch/1/config_name"] >= state._layout.numeric
+
+
+def test_inexact_values_kept_exactly():
+    mixer = mixer_api.create("X32", ip="192.168.1.1")
+    state = mixer.state()
+    state["/ch/1/mix_fader"] = 0.3
+    assert state["/ch/1/mix_fader"] == 0.3
+    state["/ch/1/mix_fader"] = "unexpected"
+    assert state["/ch/1/mix_fader"] == "unexpected"
+    state["/ch/1/mix_fader"] = 0.5
+    assert state["/ch/1/mix_fader"] == 0.5
+    assert len(state) == 1
+    del state["/ch/1/mix_fader"]
+    assert len(state) == 0
+    assert state.get("/ch/1/mix_fader") is None
+
+
+def test_family_arrays():
+    mixer = mixer_api.create("XR12", ip="192.168.1.1")
+    state = mixer.state()
+    name = "/ch/{}/mix_fader"
+    assert state.family_keys(name) == [f"/ch/{num}/mix_fader" for num in range(1, 13)]
+    mixer._update_state("/ch/02/mix/fader", [0.5])
+    assert state.family_array(name).typecode == "f"
+    assert state.family_array(name)[1] == 0.5
+    assert list(state.family_present(name))[:3] == [0, 1, 0]
+    assert state.family_values(name)[:3] == [None, 0.5, None]
+    state.clear()
+    assert len(state) == 0
+    assert state.family_values(name)[1] is None
+
+
+def test_changes_since():
+    mixer = mixer_api.create("XR12", ip="192.168.1.1")
+    mixer._update_state("/ch/01/mix/fader", [0.5])
+    changes, seq = mixer.changes_since(0)
+    assert changes == {"/ch/1/mix_fader": 0.5, "/ch/1/mix_fader_db": -10.0}
+    assert mixer.changes_since(seq) == ({}, seq)
+    mixer._update_state("/ch/01/mix/fader", [0.5])
+    mixer._update_state("/ch/02/mix/on", [1])
+    changes, new_seq = mixer.changes_since(seq)
+    assert changes == {"/ch/2/mix_on": True}
+    mixer._update_state("/ch/02/mix/on", [0])
+    mixer._update_state("/ch/01/mix/fader", [0.25])
+    changes, newest_seq = mixer.changes_since(new_seq)
+    assert changes == {
+        "/ch/2/mix_on": False,
+        "/ch/1/mix_fader": 0.25,
+        "/ch/1/mix_fader_db": -30.0,
+    }
+    mixer.state().clear()
+    mixer._update_state("/ch/03/mix/on", [1])
+    assert mixer.changes_since(newest_seq)[0] == {"/ch/3/mix_on": True}
+
+
+def _filled_size(mixer, factory):
+    """Return the memory allocated creating and filling a state, and its length"""
+    gc.collect()
+    tracemalloc.start()
+    state = factory()
+    for address, row in mixer._mappings.items():
+        if "_db" in row.get("secondary_output", {}) and not row.get("mapping"):
+            value = float32(0.3)
+        elif address.endswith("/name"):
+            value = "name"
+        else:
+            value = 1
+        for update in mixer._decode_message(address, [value]):
+            state[update["property"]] = update["value"]
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, len(state)
+
+
+def test_memory_per_mixer():
+    mixer = mixer_api.create("X32", ip="192.168.1.1")
+    store_size, store_len = _filled_size(mixer, lambda: StateStore(mixer._mappings))
+    dict_size, dict_len = _filled_size(mixer, dict)
+    assert store_len == dict_len
+    # The key layout is shared with the mixer's own store, so a further
+    # store of the type only holds its values
+    assert store_size < dict_size / 2
+
+
+def test_changes_report_reset_and_deletions():
+    mixer = mixer_api.create("XR12", ip="192.168.1.1")
+    state = mixer.state()
+    mixer._update_state("/ch/01/mix/fader", [0.5])
+    mixer._update_state("/ch/01/config/name", ["Vox"])
+    state["/extra"] = "value"
+    changes, seq = mixer.changes_since(0)
+    assert not changes.reset and changes.deleted == []
+    del state["/ch/1/mix_fader_db"]
+    del state["/ch/1/config_name"]
+    del state["/extra"]
+    changes, seq = mixer.changes_since(seq)
+    assert changes == {}
+    assert sorted(changes.deleted) == [
+        "/ch/1/config_name",
+        "/ch/1/mix_fader_db",
+        "/extra",
+    ]
+    # An inexact value moves a key from its array to the dict, not a deletion
+    state["/ch/1/mix_fader"] = 0.3
+    changes, seq = mixer.changes_since(seq)
+    assert changes == {"/ch/1/mix_fader": 0.3} and changes.deleted == []
+    state.clear()
+    mixer._update_state("/ch/02/mix/on", [1])
+    changes, seq = mixer.changes_since(seq)
+    assert changes.reset
+    assert changes == {"/ch/2/mix_on": True}
+    assert mixer.changes_since(seq)[0].reset is False
+
+
+def test_changes_walk_only_the_changed_slots():
+    mixer = mixer_api.create("X32", ip="192.168.1.1")
+    state = mixer._state
+    for number in range(1, 33):
+        mixer._update_state(f"/ch/{number:02}/mix/fader", [0.5])
+    _, seq = mixer.changes_since(0)
+    mixer._update_state("/ch/05/mix/fader", [0.25])
+    mixer._update_state("/ch/05/mix/fader", [0.75])
+    del state["/ch/6/mix_fader_db"]
+
+    def scan(*args):
+        raise AssertionError("a consumer that keeps up should not scan")
+
+    state._scanned_changes = scan
+    changes, seq = mixer.changes_since(seq)
+    assert changes == {"/ch/5/mix_fader": 0.75, "/ch/5/mix_fader_db": 0.0}
+    assert changes.deleted == ["/ch/6/mix_fader_db"]
+    del state._scanned_changes
+    # A consumer further behind than the log is answered by a full scan
+    for number in range(4 * state._dirty_size):
+        state["/ch/1/mix_fader"] = number / 1024
+    state["/ch/2/mix_fader"] = 0.125
+    changes, _ = mixer.changes_since(seq)
+    assert seq < state._dirty_floor
+    assert changes == {
+        "/ch/1/mix_fader": (4 * state._dirty_size - 1) / 1024,
+        "/ch/2/mix_fader": 0.125,
+    }
@@ -0,0 +1,41 @@
+import threading
+from behringer_mixer.sync_client import SyncMixer
+
+
+def test_calls_from_threads():
+    with SyncMixer("XR12", ip="127.0.0.1") as mixer:
+
+        async def update(number):
+            mixer.mixer._update_state(f"/ch/{number:02}/mix/on", [1])
+            return number
+
+        results = []
+
+        def worker(number):
+            for _ in range(200):
+                results.append(mixer.call(update, number))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(1, 5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(set(results)) == [1, 2, 3, 4]
+        assert len(results) == 800
+        snapshot = mixer.state()
+        assert snapshot["/ch/4/mix_on"] is True
+        assert mixer.state("/ch/5/mix_on") is None
+
+
+def test_snapshot_is_immutable_and_swapped():
+    with SyncMixer("XR12", ip="127.0.0.1") as mixer:
+
+        async def update(value):
+            mixer.mixer._update_state("/ch/01/mix/fader", [value])
+
+        mixer.call(update, 0.5)
+        first = mixer.state()
+        mixer.call(update, 0.25)
+        assert first["/ch/1/mix_fader"] == 0.5
+        assert mixer.state("/ch/1/mix_fader") == 0.25
+        assert mixer.state("/ch/1/mix_fader_db") == -30.0
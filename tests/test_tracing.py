@@ -0,0 +1,74 @@
+import logging
+import pytest
+from behringer_mixer import mixer_api
+from behringer_mixer.tracing import Tracer
+
+
+def _receive(mixer, address, *data):
+    mixer.tracer.received(32)
+    mixer.msg_handler(address, *data)
+
+
+def test_ring_buffer_keeps_latest_events():
+    tracer = Tracer(size=4)
+    for number in range(10):
+        tracer.sent(f"/ch/{number:02}/mix/fader", number)
+    events = tracer.events()
+    assert [value for _, _, _, value in events] == [6, 7, 8, 9]
+    assert [timestamp for timestamp, _, _, _ in events] == sorted(
+        timestamp for timestamp, _, _, _ in events
+    )
+    tracer.clear()
+    assert tracer.events() == []
+    assert tracer.dump() == ""
+
+
+def test_sampling_and_prefixes():
+    tracer = Tracer(sample=0.25, prefixes="/ch/01/")
+    for _ in range(100):
+        tracer.sent("/ch/01/mix/fader", 20)
+        tracer.sent("/ch/02/mix/fader", 20)
+    events = tracer.events()
+    assert len(events) == 25
+    assert {address for _, _, address, _ in events} == {"/ch/01/mix/fader"}
+
+
+def test_mixer_traces_decode_and_callback():
+    tracer = Tracer()
+    mixer = mixer_api.create("XR12", ip="127.0.0.1", tracer=tracer)
+    updates = []
+    mixer._callback_function = updates.append
+    _receive(mixer, "/ch/01/mix/fader", 0.5)
+    assert len(updates) == 2
+    assert [event for _, event, _, _ in tracer.events()] == [
+        "receive",
+        "decode",
+        "callback",
+    ]
+    assert "/ch/01/mix/fader" in tracer.dump()
+
+
+def test_callback_error_dumps_trace(caplog):
+    mixer = mixer_api.create("XR12", ip="127.0.0.1", tracer=Tracer(sample=0))
+
+    def callback(row):
+        raise RuntimeError("broken")
+
+    mixer._callback_function = callback
+    with caplog.at_level(logging.WARNING, logger="behringermixer.tracing"):
+        with pytest.raises(RuntimeError):
+            _receive(mixer, "/ch/01/mix/on", 1)
+    assert "error" in caplog.text
+    assert "broken" in caplog.text
+
+
+def test_each_direction_is_sampled_at_the_rate():
+    tracer = Tracer(size=1000, sample=0.1)
+    for _ in range(200):
+        tracer.sent("/ch/01/mix/fader", 20)
+        tracer.received(20)
+        tracer.decoded("/ch/01/mix/fader")
+    counts = {}
+    for _, event, _, _ in tracer.events():
+        counts[event] = counts.get(event, 0) + 1
+    assert counts == {"send": 20, "receive": 20, "decode": 20}